@@ -5,16 +5,37 @@ Handles MAVLink communication with Pixhawk flight controllers
 Communicates with Node.js server via HTTP REST API
 """
 
+import os
+import re
+import socket
 import time
 import json
 import threading
 import math
+import itertools
+import functools
+import queue
+from types import SimpleNamespace
+from collections import Counter, deque, namedtuple
 import requests
-from flask import Flask, jsonify, request
+from requests.adapters import HTTPAdapter
+from flask import Flask, Response, request
 from flask_cors import CORS
 from pymavlink import mavutil
 import logging
 
+# orjson is optional; it serializes the bulk telemetry payload much faster than json
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# waitress is optional; when installed it replaces the Flask development server
+try:
+    from waitress import serve
+except ImportError:
+    serve = None
+
 # Setup logging
 logging.basicConfig(
     level=logging.INFO,
@@ -22,62 +43,496 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+
+class _RepeatFilter(logging.Filter):
+    """Drop a record identical to the previous one if it comes within `interval` seconds"""
+    
+    def __init__(self, interval=1.0):
+        super().__init__()
+        self.interval = interval
+        self._last = None
+        self._last_time = 0.0
+    
+    def filter(self, record):
+        message = record.getMessage()
+        now = record.created
+        if message == self._last and now - self._last_time < self.interval:
+            return False
+        self._last = message
+        self._last_time = now
+        return True
+
+
+# Autopilot STATUSTEXT lines; autopilots repeat the same text in bursts, so
+# identical lines within a second are logged once
+statustext_logger = logging.getLogger(f'{__name__}.statustext')
+statustext_logger.addFilter(_RepeatFilter())
+
+# MAVLink dialect used to decode incoming frames. A smaller dialect (e.g. 'common'
+# or a custom one generated with mavgen into pymavlink's dialects) leaves
+# ArduPilot-specific telemetry (AHRS, EKF_STATUS_REPORT, ...) undecoded.
+MAVLINK_DIALECT = os.environ.get('GCS_MAVLINK_DIALECT', 'ardupilotmega')
+if MAVLINK_DIALECT != 'ardupilotmega':
+    try:
+        mavutil.set_dialect(MAVLINK_DIALECT)
+        logger.info(f"Using MAVLink dialect: {MAVLINK_DIALECT}")
+    except Exception as e:
+        logger.warning(f"MAVLink dialect '{MAVLINK_DIALECT}' unavailable ({e}), falling back to ardupilotmega")
+        MAVLINK_DIALECT = 'ardupilotmega'
+        mavutil.set_dialect(MAVLINK_DIALECT)
+
+# Parse with pymavlink's C parser (mavnative) when set to 1. Off by default: it is
+# not built on every platform, and pymavlink silently uses the Python parser then.
+MAVLINK_NATIVE = os.environ.get('GCS_MAVLINK_NATIVE') == '1'
+
+# Pin each drone's telemetry thread to one core and raise its priority (Linux only)
+PIN_TELEMETRY = os.environ.get('GCS_PIN_TELEMETRY') == '1'
+
 # Suppress Flask/Werkzeug request logging (too verbose)
 logging.getLogger('werkzeug').setLevel(logging.ERROR)
 
 app = Flask(__name__)
 CORS(app)
 
+# HEARTBEAT base_mode bit set while the motors are armed
+SAFETY_ARMED_FLAG = mavutil.mavlink.MAV_MODE_FLAG_SAFETY_ARMED
+# HEARTBEAT base_mode bit set when custom_mode holds the autopilot's own mode number
+CUSTOM_MODE_FLAG = mavutil.mavlink.MAV_MODE_FLAG_CUSTOM_MODE_ENABLED
+
+# Telemetry requested from every vehicle on connect, at STREAM_RATE_HZ
+STREAM_RATE_HZ = 4
+# Legacy data streams (ArduPilot style)
+TELEMETRY_STREAMS = (
+    mavutil.mavlink.MAV_DATA_STREAM_ALL,
+    mavutil.mavlink.MAV_DATA_STREAM_POSITION,
+    mavutil.mavlink.MAV_DATA_STREAM_EXTRA1,
+    mavutil.mavlink.MAV_DATA_STREAM_EXTRA2,
+    mavutil.mavlink.MAV_DATA_STREAM_EXTRA3,
+)
+# Individual message intervals (MAVLink 2 style)
+TELEMETRY_MESSAGE_IDS = (
+    mavutil.mavlink.MAVLINK_MSG_ID_GLOBAL_POSITION_INT,  # GPS position
+    mavutil.mavlink.MAVLINK_MSG_ID_GPS_RAW_INT,          # GPS raw
+    mavutil.mavlink.MAVLINK_MSG_ID_SYS_STATUS,           # Battery
+    mavutil.mavlink.MAVLINK_MSG_ID_VFR_HUD,              # Speed/Alt
+    mavutil.mavlink.MAVLINK_MSG_ID_ATTITUDE,             # Attitude
+    mavutil.mavlink.MAVLINK_MSG_ID_HEARTBEAT,            # Heartbeat
+)
+
+# GPS_RAW_INT fix_type -> name reported as gps_status in command responses
+GPS_FIX_NAMES = {0: 'NO_GPS', 1: 'NO_FIX', 2: '2D_FIX', 3: '3D_FIX', 4: 'DGPS', 5: 'RTK_FLOAT', 6: 'RTK_FIXED'}
+
+# COMMAND_ACK result for an accepted command
+_MAV_ACCEPTED = mavutil.mavlink.MAV_RESULT_ACCEPTED
+
+# param1..param7 of a COMMAND_LONG that takes no arguments
+_ZERO_PARAMS = (0.0,) * 7
+
+# Custom COMMAND_LONG ids handled by the companion Pi's detection service
+PI_CMD_START_DETECTION = 42000
+PI_CMD_STOP_DETECTION = 42001
+PI_CMD_REQUEST_STATS = 42002
+
+# STATUSTEXT reports sent by the Pi, parsed in one pass each (extra fields are ignored)
+# Detection: DET|ID|LAT|LON|CONF|AREA
+DET_RE = re.compile(r'DET\|(?P<id>[^|]*)\|(?P<lat>[^|]*)\|(?P<lon>[^|]*)\|(?P<conf>[^|]*)\|(?P<area>[^|]*)')
+# Detection stats: DSTAT|TOTAL|ACTIVE|MISSION_ID
+DSTAT_RE = re.compile(r'DSTAT\|(?P<total>[^|]*)\|(?P<active>[^|]*)\|(?P<mission>[^|]*)')
+# System stats: STAT|CPU|MEM|DISK|TEMP
+STAT_RE = re.compile(r'STAT\|(?P<cpu>[^|]*)\|(?P<mem>[^|]*)\|(?P<disk>[^|]*)\|(?P<temp>[^|]*)')
+
+# Mission command names accepted in waypoint dicts, mapped to MAV_CMD ids
+MISSION_COMMANDS = {
+    'TAKEOFF': mavutil.mavlink.MAV_CMD_NAV_TAKEOFF,
+    'NAV_TAKEOFF': mavutil.mavlink.MAV_CMD_NAV_TAKEOFF,
+    'WAYPOINT': mavutil.mavlink.MAV_CMD_NAV_WAYPOINT,
+    'NAV_WAYPOINT': mavutil.mavlink.MAV_CMD_NAV_WAYPOINT,
+    'RTL': mavutil.mavlink.MAV_CMD_NAV_RETURN_TO_LAUNCH,
+    'RETURN_TO_LAUNCH': mavutil.mavlink.MAV_CMD_NAV_RETURN_TO_LAUNCH,
+    'NAV_RETURN_TO_LAUNCH': mavutil.mavlink.MAV_CMD_NAV_RETURN_TO_LAUNCH,
+}
+
+
+# .waypoints (QGC WPL 110) frame column -> MAVLink frame; others upload as relative-alt
+WPL_FRAMES = {
+    0: mavutil.mavlink.MAV_FRAME_GLOBAL,
+    3: mavutil.mavlink.MAV_FRAME_GLOBAL_RELATIVE_ALT,
+    6: mavutil.mavlink.MAV_FRAME_GLOBAL_RELATIVE_ALT_INT,
+}
+WPL_DEFAULT_FRAME = mavutil.mavlink.MAV_FRAME_GLOBAL_RELATIVE_ALT
+
+
+@functools.lru_cache(maxsize=64)
+def _mode_string(autopilot, mav_type, base_mode, custom_mode):
+    """mavutil.mode_string_v10 memoized on the HEARTBEAT fields it reads"""
+    return mavutil.mode_string_v10(SimpleNamespace(
+        autopilot=autopilot, type=mav_type, base_mode=base_mode, custom_mode=custom_mode))
+
+
+# Normalized MISSION_ITEM fields for one waypoint, built once per upload
+MissionItem = namedtuple('MissionItem', 'frame command autocontinue param1 param2 param3 param4 lat lon alt')
+
+# MAV_CMD id -> name used when logging uploaded or read-back mission items
+# (seq 0 is logged as HOME by the callers)
+MISSION_COMMAND_NAMES = {
+    mavutil.mavlink.MAV_CMD_NAV_WAYPOINT: "WAYPOINT",
+    mavutil.mavlink.MAV_CMD_NAV_TAKEOFF: "TAKEOFF",
+    mavutil.mavlink.MAV_CMD_NAV_RETURN_TO_LAUNCH: "RTL",
+    mavutil.mavlink.MAV_CMD_NAV_VTOL_TAKEOFF: "NAV_VTOL_TAKEOFF",
+    mavutil.mavlink.MAV_CMD_DO_CHANGE_SPEED: "CHANGE_SPEED",
+}
+
+
+class _KeepAliveAdapter(HTTPAdapter):
+    """HTTPAdapter whose pooled sockets have TCP_NODELAY and SO_KEEPALIVE set"""
+    
+    SOCKET_OPTIONS = [
+        (socket.IPPROTO_TCP, socket.TCP_NODELAY, 1),
+        (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1),
+    ]
+    
+    def init_poolmanager(self, *args, **kwargs):
+        kwargs['socket_options'] = self.SOCKET_OPTIONS
+        super().init_poolmanager(*args, **kwargs)
+
+
+# Node.js server (receives forwarded detections). One pooled keep-alive
+# session is shared by all drones instead of a new connection per POST.
+# The default is 127.0.0.1 rather than localhost: Node listens on IPv4 only,
+# and Windows may try ::1 first and wait for it to fail before falling back.
+NODE_SERVER_URL = os.environ.get('NODE_SERVER_URL', 'http://127.0.0.1:3000')
+node_session = requests.Session()
+node_session.mount('http://', _KeepAliveAdapter(pool_connections=4, pool_maxsize=32))
+
+# Detections waiting to be POSTed to Node.js. The telemetry threads only enqueue;
+# one forwarder thread drains the queue in batches of up to DETECTION_BATCH_MAX.
+detection_queue = queue.SimpleQueue()
+DETECTION_BATCH_MAX = 32
+_detection_forwarder = None
+_detection_forwarder_lock = threading.Lock()
+
+
+def _forward_detections():
+    """Forwarder thread: POST queued detections to Node.js, batching whatever has piled up"""
+    while True:
+        batch = [detection_queue.get()]
+        while len(batch) < DETECTION_BATCH_MAX:
+            try:
+                batch.append(detection_queue.get_nowait())
+            except queue.Empty:
+                break
+        try:
+            response = node_session.post(
+                f'{NODE_SERVER_URL}/api/mavlink-detection/batch',
+                json=batch,
+                timeout=1
+            )
+            if response.status_code == 200:
+                logger.debug(f"Forwarded {len(batch)} detection(s) to Node.js server")
+        except Exception:
+            # Node.js unreachable - telemetry polling still picks detections up
+            pass
+
+
+def queue_detection(detection_data):
+    """Queue a detection for the forwarder thread, starting it on first use"""
+    global _detection_forwarder
+    if _detection_forwarder is None:
+        with _detection_forwarder_lock:
+            if _detection_forwarder is None:
+                _detection_forwarder = threading.Thread(target=_forward_detections, daemon=True)
+                _detection_forwarder.start()
+    detection_queue.put(detection_data)
+
+
+def _dumps(payload):
+    """Encode payload as JSON, with orjson when available and stdlib json otherwise"""
+    if orjson is not None:
+        return orjson.dumps(payload, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(payload)
+
+
+def ojson(payload, status=200):
+    """JSON response encoded with _dumps()"""
+    return Response(_dumps(payload), status=status, mimetype='application/json')
+
+
+# Largest mission upload body accepted (checked before the JSON is decoded)
+MAX_MISSION_BYTES = 256 * 1024
+
+# Body of the common "Drone not connected" 404, encoded once at import
+_NOT_CONNECTED_BODY = _dumps({'success': False, 'error': 'Drone not connected'})
+
+
 # Store drone connections
 drones = {}
 drone_telemetry = {}
+# Per-drone locks serializing connect/simulate/disconnect of the same drone id;
+# different drones never wait on each other
 drone_locks = {}
+# Ids of drones whose connection is up; kept by connect()/disconnect()
+connected_drones = set()
+
+# Background mission jobs started with {"async": true}; polled via /drone/<id>/job/<job_id>
+jobs = {}
+jobs_lock = threading.Lock()
+_job_ids = itertools.count(1)
+MAX_JOBS = 100  # Finished jobs beyond this are forgotten, oldest first
+
+
+def submit_job(drone_id, command, fn, *args):
+    """Run a blocking drone method on a background thread and track it as a job"""
+    job = {
+        'job_id': next(_job_ids),
+        'drone_id': drone_id,
+        'command': command,
+        'status': 'running',
+        'result': None,
+        'started_at': time.time(),
+        'finished_at': None
+    }
+    
+    def run():
+        try:
+            job['result'] = fn(*args)
+            job['status'] = 'done'
+        except Exception as e:
+            logger.error(f"Job {job['job_id']} ({command}) failed for Drone {drone_id}: {e}")
+            job['result'] = {'success': False, 'error': str(e)}
+            job['status'] = 'error'
+        job['finished_at'] = time.time()
+    
+    with jobs_lock:
+        jobs[job['job_id']] = job
+        finished = [jid for jid, j in jobs.items() if j['status'] != 'running']
+        for jid in finished[:max(0, len(jobs) - MAX_JOBS)]:
+            del jobs[jid]
+    
+    threading.Thread(target=run, daemon=True).start()
+    logger.info(f"Started job {job['job_id']} ({command}) for Drone {drone_id}")
+    return job
+
+
+def job_accepted(job, **extra):
+    """202 response returned when a mission command is queued as a job"""
+    return ojson({
+        'success': True,
+        'command': job['command'],
+        'drone_id': job['drone_id'],
+        'job_id': job['job_id'],
+        'status': job['status'],
+        **extra
+    }, 202)
+
+
+class _BatchWriter:
+    """Stand-in for MAVLink.file that coalesces outgoing frames into fewer port writes
+    
+    Frames are buffered until flush_size bytes accumulate or flush() is called,
+    so several mission items answered together cost one write() instead of one each.
+    Any thread sending on the link while it is installed writes here, so the buffer
+    is taken and cleared under a lock.
+    """
+    
+    def __init__(self, link, flush_size=252):
+        self.link = link
+        self.flush_size = flush_size
+        self.buf = bytearray()
+        self.lock = threading.Lock()
+    
+    def write(self, data):
+        with self.lock:
+            self.buf += data
+            if len(self.buf) < self.flush_size:
+                return
+            data = bytes(self.buf)
+            self.buf.clear()
+        self.link.write(data)
+    
+    def flush(self):
+        with self.lock:
+            if not self.buf:
+                return
+            data = bytes(self.buf)
+            self.buf.clear()
+        self.link.write(data)
+
+
+class Telemetry:
+    """Latest telemetry of one drone, one slot per field
+    
+    Written by the telemetry/simulation loops under DroneConnection.lock and read
+    as attributes by the command paths. HTTP responses use the to_dict() snapshot.
+    """
+    
+    __slots__ = (
+        'armed', 'flight_mode', 'latitude', 'longitude', 'altitude', 'relative_altitude',
+        'heading', 'groundspeed', 'airspeed', 'climb_rate', 'throttle', 'roll', 'pitch', 'yaw',
+        'battery_voltage', 'battery_current', 'battery_remaining', 'satellites_visible',
+        'gps_fix_type', 'hdop', 'timestamp', 'statustext_log', 'mavlink_detections'
+    )
+    
+    def __init__(self):
+        self.armed = False
+        self.flight_mode = 'UNKNOWN'
+        self.latitude = 0.0
+        self.longitude = 0.0
+        self.altitude = 0.0
+        self.relative_altitude = 0.0
+        self.heading = 0.0
+        self.groundspeed = 0.0
+        self.airspeed = 0.0
+        self.climb_rate = 0.0
+        self.throttle = 0
+        self.roll = 0.0
+        self.pitch = 0.0
+        self.yaw = 0.0
+        self.battery_voltage = 0.0
+        self.battery_current = 0.0
+        self.battery_remaining = 0
+        self.satellites_visible = 0
+        self.gps_fix_type = 0
+        self.hdop = 99.99
+        self.timestamp = time.time()
+        # Filled in at publish time from DroneConnection.statustext_log/detection_log
+        self.statustext_log = []  # Last STATUSTEXT messages from autopilot
+        self.mavlink_detections = []  # Last detections received over MAVLink
+    
+    def to_dict(self):
+        """Field name -> value, as served by the telemetry endpoints"""
+        return {name: getattr(self, name) for name in self.__slots__}
 
 
 class DroneConnection:
     """Manages connection to a single drone via MAVLink"""
     
-    def __init__(self, drone_id, port, baudrate=57600, simulation=False):
+    # Consecutive telemetry errors before the loop logs that it keeps retrying
+    TELEMETRY_MAX_ERRORS = 5
+    # Seconds set_mode() waits for a confirming HEARTBEAT before repeating SET_MODE
+    SET_MODE_RESEND_AFTER = 0.2
+    # Degrees <-> MAVLink integer coordinates (degE7)
+    COORD_SCALE = 10_000_000
+    # goto() keeps re-sending its GUIDED setpoint at this rate until the drone is
+    # within SETPOINT_REACHED_M of the target, leaves GUIDED or gets a new command
+    SETPOINT_RATE_HZ = 2
+    SETPOINT_REACHED_M = 2.0
+    # Meters per degree of latitude (and of longitude at the equator)
+    METERS_PER_DEGREE = 111_320
+    
+    def __init__(self, drone_id, port, baudrate=57600, simulation=False,
+                 mission_item_timeout=None, ack_timeout=None, mission_upload_window=1):
         self.drone_id = drone_id
         self.port = port
         self.baudrate = baudrate
+        # Per-link protocol timeouts (seconds); derived from the link type unless given
+        default_item_timeout, default_ack_timeout = self._link_timeouts(port, baudrate)
+        self.mission_item_timeout = mission_item_timeout or default_item_timeout
+        self.ack_timeout = ack_timeout or default_ack_timeout
+        # Mission items sent ahead of the autopilot's requests. 1 = strict request/response
+        # (required by ArduPilot, which drops unrequested items); >1 only for autopilots
+        # that accept pipelined items. 'all' sends the whole mission at the first request
+        # and then only answers re-requests, for low-loss links to such autopilots
+        if mission_upload_window == 'all':
+            self.mission_upload_window = None
+        else:
+            self.mission_upload_window = max(1, int(mission_upload_window or 1))
         self.master = None
         self.connected = False
         self.simulation = simulation  # Simulation mode flag
-        self.telemetry = {
-            'armed': False,
-            'flight_mode': 'UNKNOWN',
-            'latitude': 0.0,
-            'longitude': 0.0,
-            'altitude': 0.0,
-            'relative_altitude': 0.0,
-            'heading': 0.0,
-            'groundspeed': 0.0,
-            'airspeed': 0.0,
-            'climb_rate': 0.0,
-            'throttle': 0,
-            'roll': 0.0,
-            'pitch': 0.0,
-            'yaw': 0.0,
-            'battery_voltage': 0.0,
-            'battery_current': 0.0,
-            'battery_remaining': 0,
-            'satellites_visible': 0,
-            'gps_fix_type': 0,
-            'hdop': 99.99,
-            'timestamp': time.time(),
-            'statustext_log': []  # Last STATUSTEXT messages from autopilot
-        }
+        self.telemetry = Telemetry()
         self.lock = threading.Lock()
         self.running = False
         self.thread = None
         self.mission_waypoints = []
         self.current_waypoint_index = 0
         self.mission_active = False
-        self.statustext_log = []  # Store last 20 STATUSTEXT messages for debugging
+        self._sim_targets = []  # (lat, lon, alt) per waypoint, built when a simulated mission starts
         self.statustext_max = 20
+        # Last statustext_max STATUSTEXT messages for debugging; the deque drops the
+        # oldest on append. _statustext_list is the copy published with telemetry,
+        # refreshed only when a message arrives instead of on every publish.
+        self.statustext_log = deque(maxlen=self.statustext_max)
+        self._statustext_list = []
+        # Same for the last 50 detections received over MAVLink (DET| STATUSTEXT)
+        self.detection_log = deque(maxlen=50)
+        self._detection_list = []
         self.uploading_mission = False  # Flag to pause telemetry during mission upload
+        self._mode_map = {}  # mode name -> custom_mode, filled on connect
+        self._mode_names = {}  # custom_mode -> mode name, filled on connect
+        # Vehicle address and bound COMMAND_LONG sender, filled on connect
+        self.target_sys = 0
+        self.target_comp = 0
+        self._cmd_long = None
+        # Latest HEARTBEAT state published by the telemetry loop; command paths wait
+        # on _hb_event instead of reading HEARTBEATs off the link themselves
+        self._hb_event = threading.Event()
+        self._last_hb = {'armed': False, 'mode': 'UNKNOWN', 'custom_mode': None}
+        # COMMAND_ACK slots (command id -> event + result) filled by the telemetry loop
+        self._pending_acks = {}
+        # Set by the telemetry loop once it has seen uploading_mission and stopped reading
+        self._telemetry_paused = threading.Event()
+        # Set by the telemetry loop on every MISSION_CURRENT (which also updates
+        # current_waypoint_index); cleared by start_mission to wait for a fresh one
+        self._mission_current_event = threading.Event()
+        # Progress of the last start_mission: idle, guided, auto_set, confirmed or failed
+        self._mission_start_state = 'idle'
+        self._mission_start_result = None
+        # Stop event of the thread re-sending the last goto() setpoint, if any
+        self._setpoint_stop = None
+        self._publish_telemetry()
+        
+    @staticmethod
+    def _link_timeouts(port, baudrate):
+        """Default (mission_item_timeout, ack_timeout) for a link
+        
+        Network links and serial links at 8000 baud or more (9600, 57600, 115200
+        radios) all get 1.5s/0.5s; pass mission_item_timeout/ack_timeout to connect
+        for a slower radio. Only serial links under 8000 baud scale up (2.5s at 4800).
+        """
+        port = str(port).lower()
+        if port.startswith(('udp', 'tcp')):
+            return 1.5, 0.5
+        baudrate = baudrate or 57600
+        item_timeout = max(1.5, 40.0 / baudrate * 300)
+        return item_timeout, max(0.5, item_timeout / 3)
+    
+    def _set_low_latency(self):
+        """Ask the kernel to deliver serial bytes immediately (ASYNC_LOW_LATENCY)
+        
+        USB-UART adapters (FTDI, CP210x) otherwise hold received bytes for up to
+        16ms before handing them over. pyserial only offers this on Linux; network
+        links and other platforms are left as they are.
+        """
+        set_low_latency = getattr(self.master.port, 'set_low_latency_mode', None)
+        if set_low_latency is None:
+            return
+        try:
+            set_low_latency(True)
+            logger.info(f"Low-latency serial mode enabled for Drone {self.drone_id}")
+        except Exception as e:
+            # Not every driver supports TIOCSSERIAL; the link still works without it
+            logger.debug(f"Low-latency serial mode unavailable for Drone {self.drone_id}: {e}")
+    
+    def _pin_telemetry_thread(self):
+        """Pin the calling telemetry thread to core drone_id % cpu_count and ask for SCHED_RR
         
+        On Linux pid 0 means the calling thread, so other threads are unaffected.
+        Real-time priority needs CAP_SYS_NICE; without it the thread keeps the
+        normal scheduler. Platforms without these calls are left as they are.
+        """
+        if not hasattr(os, 'sched_setaffinity'):
+            return
+        try:
+            core = self.drone_id % os.cpu_count()
+            os.sched_setaffinity(0, {core})
+            logger.info(f"Telemetry thread for Drone {self.drone_id} pinned to CPU {core}")
+        except OSError as e:
+            logger.debug(f"Could not pin telemetry thread for Drone {self.drone_id}: {e}")
+        try:
+            os.sched_setscheduler(0, os.SCHED_RR, os.sched_param(40))
+        except (OSError, AttributeError) as e:
+            logger.debug(f"Real-time priority unavailable for Drone {self.drone_id}: {e}")
+    
     def connect(self):
         """Establish connection to Pixhawk (or simulation)"""
         try:
@@ -86,16 +541,18 @@ class DroneConnection:
                 # In simulation, we don't need real MAVLink connection
                 self.master = None
                 self.connected = True
+                connected_drones.add(self.drone_id)
                 
                 # Set simulated telemetry
-                self.telemetry['latitude'] = 12.9716 + (self.drone_id * 0.001)
-                self.telemetry['longitude'] = 77.5946 + (self.drone_id * 0.001)
-                self.telemetry['altitude'] = 0.0
-                self.telemetry['battery_voltage'] = 16.4
-                self.telemetry['battery_remaining'] = 95
-                self.telemetry['satellites_visible'] = 12
-                self.telemetry['gps_fix_type'] = 3
-                self.telemetry['flight_mode'] = 'STABILIZE'
+                self.telemetry.latitude = 12.9716 + (self.drone_id * 0.001)
+                self.telemetry.longitude = 77.5946 + (self.drone_id * 0.001)
+                self.telemetry.altitude = 0.0
+                self.telemetry.battery_voltage = 16.4
+                self.telemetry.battery_remaining = 95
+                self.telemetry.satellites_visible = 12
+                self.telemetry.gps_fix_type = 3
+                self.telemetry.flight_mode = 'STABILIZE'
+                self._publish_telemetry()
                 
                 logger.info(f"✅ Simulated Drone {self.drone_id} connected (Virtual Flight Controller)")
                 
@@ -113,8 +570,10 @@ class DroneConnection:
                 self.port,
                 baud=self.baudrate,
                 source_system=255,
-                source_component=0
+                source_component=0,
+                use_native=MAVLINK_NATIVE
             )
+            self._set_low_latency()
             
             # Wait for heartbeat
             logger.info(f"Waiting for heartbeat from Drone {self.drone_id}...")
@@ -122,8 +581,16 @@ class DroneConnection:
             
             if heartbeat:
                 self.connected = True
+                connected_drones.add(self.drone_id)
                 logger.info(f" Drone {self.drone_id} connected! System {self.master.target_system}, Component {self.master.target_component}")
                 
+                # Cache the vehicle's mode mapping both ways so set_mode and HEARTBEAT decoding are dict lookups
+                self._mode_map = {k.upper(): v for k, v in (self.master.mode_mapping() or {}).items()}
+                self._mode_names = {v: k for k, v in self._mode_map.items()}
+                self.target_sys = self.master.target_system
+                self.target_comp = self.master.target_component
+                self._cmd_long = self.master.mav.command_long_send
+                
                 # Request data streams
                 self.request_data_streams()
                 
@@ -140,229 +607,367 @@ class DroneConnection:
         except Exception as e:
             logger.error(f"Failed to connect to Drone {self.drone_id}: {e}")
             self.connected = False
+            connected_drones.discard(self.drone_id)
             return False
     
     def request_data_streams(self):
         """Request telemetry data streams from Pixhawk"""
+        # The eleven requests (~400 bytes) are buffered and written to the link in
+        # one go; nothing else sends yet, as the telemetry thread starts afterwards
+        batch = _BatchWriter(self.master, flush_size=1024)
+        self.master.mav.file = batch
         try:
-            # Request all data streams at 4 Hz (ArduPilot style)
-            for stream_id in [
-                mavutil.mavlink.MAV_DATA_STREAM_ALL,
-                mavutil.mavlink.MAV_DATA_STREAM_POSITION,
-                mavutil.mavlink.MAV_DATA_STREAM_EXTRA1,
-                mavutil.mavlink.MAV_DATA_STREAM_EXTRA2,
-                mavutil.mavlink.MAV_DATA_STREAM_EXTRA3,
-            ]:
+            # Request all data streams (ArduPilot style)
+            for stream_id in TELEMETRY_STREAMS:
                 self.master.mav.request_data_stream_send(
-                    self.master.target_system,
-                    self.master.target_component,
+                    self.target_sys,
+                    self.target_comp,
                     stream_id,
-                    4,  # Hz
+                    STREAM_RATE_HZ,
                     1   # Start
                 )
-                time.sleep(0.05)  # Small delay between requests
             
             # Also request individual message rates (MAVLink 2 style)
-            message_ids = [
-                mavutil.mavlink.MAVLINK_MSG_ID_GLOBAL_POSITION_INT,  # GPS position
-                mavutil.mavlink.MAVLINK_MSG_ID_GPS_RAW_INT,          # GPS raw
-                mavutil.mavlink.MAVLINK_MSG_ID_SYS_STATUS,           # Battery
-                mavutil.mavlink.MAVLINK_MSG_ID_VFR_HUD,              # Speed/Alt
-                mavutil.mavlink.MAVLINK_MSG_ID_ATTITUDE,             # Attitude
-                mavutil.mavlink.MAVLINK_MSG_ID_HEARTBEAT,            # Heartbeat
-            ]
-            
-            for msg_id in message_ids:
+            for msg_id in TELEMETRY_MESSAGE_IDS:
                 self.master.mav.command_long_send(
-                    self.master.target_system,
-                    self.master.target_component,
+                    self.target_sys,
+                    self.target_comp,
                     mavutil.mavlink.MAV_CMD_SET_MESSAGE_INTERVAL,
                     0,
                     msg_id,    # Message ID
-                    250000,    # Interval in microseconds (4 Hz = 250ms = 250000us)
+                    1_000_000 // STREAM_RATE_HZ,  # Interval in microseconds (4 Hz = 250000us)
                     0, 0, 0, 0, 0
                 )
-                time.sleep(0.05)
             
+            # No pacing needed between sends: MAVLink frames are queued back-to-back
+            # and the COMMAND_ACKs are drained by the telemetry loop started next
+            self.master.mav.file = self.master
+            batch.flush()
             logger.info(f"✅ Data streams requested for Drone {self.drone_id}")
         except Exception as e:
             logger.error(f"Error requesting data streams: {e}")
+        finally:
+            self.master.mav.file = self.master
     
     def _telemetry_loop(self):
         """Background thread to receive telemetry"""
         logger.info(f"Telemetry loop started for Drone {self.drone_id}")
+        if PIN_TELEMETRY:
+            self._pin_telemetry_thread()
         error_count = 0
-        max_errors = 5
-        message_counts = {}  # Track message types received
+        message_counts = Counter()  # Track message types received
         last_log_time = time.time()
         
         while self.running and self.connected:
             try:
                 # PAUSE TELEMETRY DURING MISSION UPLOAD to avoid threading race conditions
                 if self.uploading_mission:
+                    self._telemetry_paused.set()
                     time.sleep(0.1)  # Sleep briefly and retry
                     continue
                 
-                msg = self.master.recv_match(blocking=True, timeout=1.0)
+                # Take whatever is already parsed/buffered first; only when the link is
+                # drained sleep in select() until more bytes arrive (same as _wait_msg)
+                msg = self.master.recv_match(blocking=False)
                 
                 if msg is None:
+                    self.master.select(0.05)
                     continue
                 
                 # Reset error count on successful message
                 error_count = 0
                 msg_type = msg.get_type()
+                # Read the clock once per message, for the stats window and the timestamp
+                now = time.time()
                 
                 # Count messages for debugging
-                message_counts[msg_type] = message_counts.get(msg_type, 0) + 1
+                message_counts[msg_type] += 1
                 
                 # Log message statistics every 10 seconds
-                if time.time() - last_log_time > 10:
-                    logger.info(f"Drone {self.drone_id} message stats (last 10s): {dict(list(message_counts.items())[:5])}")
-                    last_log_time = time.time()
-                    message_counts.clear()
+                if now - last_log_time > 10:
+                    if logger.isEnabledFor(logging.INFO):
+                        logger.info("Drone %s message stats (last 10s): %s", self.drone_id, dict(message_counts.most_common(5)))
+                    last_log_time = now
+                    message_counts = Counter()  # Fresh table so transient types don't accumulate
                 
-                # Update telemetry based on message type
-                with self.lock:
-                    if msg_type == 'HEARTBEAT':
-                        self.telemetry['armed'] = msg.base_mode & mavutil.mavlink.MAV_MODE_FLAG_SAFETY_ARMED != 0
-                        self.telemetry['flight_mode'] = mavutil.mode_string_v10(msg)
-                        
-                    elif msg_type == 'GLOBAL_POSITION_INT':
-                        self.telemetry['latitude'] = msg.lat / 1e7
-                        self.telemetry['longitude'] = msg.lon / 1e7
-                        self.telemetry['altitude'] = msg.alt / 1000.0
-                        self.telemetry['relative_altitude'] = msg.relative_alt / 1000.0
-                        self.telemetry['heading'] = msg.hdg / 100.0 if msg.hdg != 65535 else 0.0
-                        # Calculate groundspeed from vx, vy
-                        vx = msg.vx / 100.0  # cm/s to m/s
-                        vy = msg.vy / 100.0
-                        self.telemetry['groundspeed'] = math.sqrt(vx*vx + vy*vy)
-                        
-                    elif msg_type == 'ATTITUDE':
-                        self.telemetry['roll'] = msg.roll * 57.2958  # rad to deg
-                        self.telemetry['pitch'] = msg.pitch * 57.2958
-                        self.telemetry['yaw'] = msg.yaw * 57.2958
-                        
-                    elif msg_type == 'SYS_STATUS':
-                        self.telemetry['battery_voltage'] = msg.voltage_battery / 1000.0
-                        self.telemetry['battery_current'] = msg.current_battery / 100.0
-                        self.telemetry['battery_remaining'] = msg.battery_remaining
-                        
-                    elif msg_type == 'GPS_RAW_INT':
-                        self.telemetry['satellites_visible'] = msg.satellites_visible if hasattr(msg, 'satellites_visible') else 0
-                        self.telemetry['gps_fix_type'] = msg.fix_type if hasattr(msg, 'fix_type') else 0
-                        self.telemetry['hdop'] = msg.eph / 100.0 if hasattr(msg, 'eph') and msg.eph != 65535 else 99.99
-                        
-                    elif msg_type == 'VFR_HUD':
-                        self.telemetry['airspeed'] = msg.airspeed if hasattr(msg, 'airspeed') else 0.0
-                        self.telemetry['climb_rate'] = msg.climb if hasattr(msg, 'climb') else 0.0
-                        self.telemetry['throttle'] = msg.throttle if hasattr(msg, 'throttle') else 0
-
-                        # Smooth groundspeed using a weighted average to reduce fluctuations
-                        if 'groundspeed' in self.telemetry and self.telemetry['groundspeed'] > 0:
-                            self.telemetry['groundspeed'] = (
-                                0.8 * self.telemetry['groundspeed'] + 0.2 * (msg.groundspeed if hasattr(msg, 'groundspeed') else 0.0)
-                            )
-                        else:
-                            self.telemetry['groundspeed'] = msg.groundspeed if hasattr(msg, 'groundspeed') else 0.0
-
-                        # Also get altitude from VFR_HUD as backup
-                        if 'relative_altitude' not in self.telemetry or self.telemetry['relative_altitude'] == 0:
-                            self.telemetry['relative_altitude'] = msg.alt if hasattr(msg, 'alt') else 0.0
-                    
-                    elif msg_type == 'STATUSTEXT':
-                        # Capture status messages for debugging (pre-arm failures, etc.)
-                        severity = getattr(msg, 'severity', 0)
-                        text = getattr(msg, 'text', '').strip()
-                        timestamp = time.time()
-                        
-                        # Parse detection messages (sent by Pi via MAVLink)
-                        # Format: DET|ID|LAT|LON|CONF|AREA
-                        if text.startswith('DET|'):
-                            try:
-                                parts = text.split('|')
-                                if len(parts) >= 6:
-                                    detection_data = {
-                                        'detection_id': parts[1],
-                                        'latitude': float(parts[2]),
-                                        'longitude': float(parts[3]),
-                                        'confidence': float(parts[4]),
-                                        'detection_area': int(parts[5]) if parts[5].isdigit() else 0,
-                                        'timestamp': timestamp,
-                                        'drone_id': self.drone_id,
-                                        'source': 'mavlink_telemetry'
-                                    }
-                                    # Emit detection to Node.js server
-                                    self._forward_detection_to_server(detection_data)
-                                    logger.info(f"📡 Drone {self.drone_id} MAVLink Detection: {parts[1]} at ({parts[2]}, {parts[3]})")
-                            except Exception as e:
-                                logger.error(f"Failed to parse detection message: {text}, error: {e}")
-                        
-                        # Parse detection stats: DSTAT|TOTAL|ACTIVE|MISSION_ID
-                        elif text.startswith('DSTAT|'):
-                            try:
-                                parts = text.split('|')
-                                if len(parts) >= 4:
-                                    logger.info(f"📊 Drone {self.drone_id} Detection Stats: Total={parts[1]}, Active={parts[2]}, Mission={parts[3]}")
-                            except Exception as e:
-                                logger.error(f"Failed to parse detection stats: {text}, error: {e}")
-                        
-                        # Parse system stats: STAT|CPU|MEM|DISK|TEMP
-                        elif text.startswith('STAT|'):
-                            try:
-                                parts = text.split('|')
-                                if len(parts) >= 5:
-                                    logger.debug(f"💻 Drone {self.drone_id} Pi Stats: CPU={parts[1]}% MEM={parts[2]}% DISK={parts[3]}% TEMP={parts[4]}°C")
-                            except Exception as e:
-                                logger.error(f"Failed to parse system stats: {text}, error: {e}")
-                        
-                        # Store all STATUSTEXT messages
-                        status_entry = {'severity': severity, 'text': text, 'timestamp': timestamp}
-                        self.statustext_log.append(status_entry)
-                        # Keep only last N messages
-                        if len(self.statustext_log) > self.statustext_max:
-                            self.statustext_log.pop(0)
-                        self.telemetry['statustext_log'] = self.statustext_log.copy()
-                        # Log notable messages (severity < 4 is warning+)
-                        if severity < 4:
-                            logger.info(f"[{severity}] Drone {self.drone_id} STATUSTEXT: {text}")
-                        
-                    self.telemetry['timestamp'] = time.time()
+                # Update telemetry based on message type; types without a handler
+                # leave the telemetry (and its published snapshot) untouched
+                handler = self._MSG_HANDLERS.get(msg_type)
+                if handler is not None:
+                    with self.lock:
+                        handler(self, msg)
+                        self.telemetry.timestamp = now
+                        self._publish_telemetry()
                     
             except Exception as e:
                 error_count += 1
                 # Only log every 5th error to avoid spam
                 if error_count % 5 == 0:
                     logger.warning(f"Telemetry errors for Drone {self.drone_id}: {error_count} consecutive errors")
-                # Disconnect if too many errors
-                if error_count >= max_errors:
+                # Logged once per error streak; the count keeps growing so the backoff below
+                # does too, and only a successfully read message resets it
+                if error_count == self.TELEMETRY_MAX_ERRORS:
                     logger.error(f"Too many telemetry errors for Drone {self.drone_id}, maintaining connection but reducing error logs")
-                    error_count = 0  # Reset but continue trying
-                time.sleep(0.1)  # Brief pause on error
-                time.sleep(0.1)
+                # Exponential backoff: 20ms, 40ms, 80ms... capped at 0.5s
+                time.sleep(min(0.5, 0.01 * (1 << min(error_count, 6))))
         
         logger.info(f"Telemetry loop stopped for Drone {self.drone_id}")
     
+    def _on_heartbeat(self, msg):
+        """Armed state and flight mode; wakes _wait_heartbeat()"""
+        t = self.telemetry
+        t.armed = (msg.base_mode & SAFETY_ARMED_FLAG) != 0
+        t.flight_mode = self._mode_name(msg)
+        # custom_mode is only meaningful with the custom-mode flag; None otherwise
+        custom_mode = msg.custom_mode if msg.base_mode & CUSTOM_MODE_FLAG else None
+        self._last_hb = {'armed': t.armed, 'mode': t.flight_mode, 'custom_mode': custom_mode}
+        self._hb_event.set()
+    
+    def _on_command_ack(self, msg):
+        """Deliver the ACK to a command waiting in wait_ack()"""
+        slot = self._pending_acks.get(msg.command)
+        if slot is not None:
+            slot.result = msg.result
+            slot.event.set()
+    
+    def _on_mission_current(self, msg):
+        """Mission item being executed; wakes start_mission()/get_mission_status()"""
+        self.current_waypoint_index = msg.seq
+        self._mission_current_event.set()
+    
+    def _on_global_position_int(self, msg):
+        """Position, heading and groundspeed"""
+        t = self.telemetry
+        t.latitude = msg.lat / 1e7
+        t.longitude = msg.lon / 1e7
+        t.altitude = msg.alt / 1000.0
+        t.relative_altitude = msg.relative_alt / 1000.0
+        t.heading = msg.hdg / 100.0 if msg.hdg != 65535 else 0.0
+        # Calculate groundspeed from vx, vy
+        vx = msg.vx / 100.0  # cm/s to m/s
+        vy = msg.vy / 100.0
+        t.groundspeed = math.hypot(vx, vy)
+    
+    def _on_attitude(self, msg):
+        """Roll, pitch and yaw in degrees"""
+        t = self.telemetry
+        t.roll = math.degrees(msg.roll)
+        t.pitch = math.degrees(msg.pitch)
+        t.yaw = math.degrees(msg.yaw)
+    
+    def _on_sys_status(self, msg):
+        """Battery state"""
+        t = self.telemetry
+        t.battery_voltage = msg.voltage_battery / 1000.0
+        t.battery_current = msg.current_battery / 100.0
+        t.battery_remaining = msg.battery_remaining
+    
+    def _on_gps_raw_int(self, msg):
+        """GPS fix, satellites and HDOP"""
+        t = self.telemetry
+        t.satellites_visible = msg.satellites_visible if hasattr(msg, 'satellites_visible') else 0
+        t.gps_fix_type = msg.fix_type if hasattr(msg, 'fix_type') else 0
+        t.hdop = msg.eph / 100.0 if hasattr(msg, 'eph') and msg.eph != 65535 else 99.99
+    
+    def _on_vfr_hud(self, msg):
+        """Airspeed, climb rate, throttle and smoothed groundspeed"""
+        t = self.telemetry
+        t.airspeed = msg.airspeed if hasattr(msg, 'airspeed') else 0.0
+        t.climb_rate = msg.climb if hasattr(msg, 'climb') else 0.0
+        t.throttle = msg.throttle if hasattr(msg, 'throttle') else 0
+
+        # Smooth groundspeed using a weighted average to reduce fluctuations
+        if t.groundspeed > 0:
+            t.groundspeed = (
+                0.8 * t.groundspeed + 0.2 * (msg.groundspeed if hasattr(msg, 'groundspeed') else 0.0)
+            )
+        else:
+            t.groundspeed = msg.groundspeed if hasattr(msg, 'groundspeed') else 0.0
+
+        # Also get altitude from VFR_HUD as backup
+        if t.relative_altitude == 0:
+            t.relative_altitude = msg.alt if hasattr(msg, 'alt') else 0.0
+    
+    def _on_statustext(self, msg):
+        """Status messages, including detections and stats sent by the Pi"""
+        # Capture status messages for debugging (pre-arm failures, etc.)
+        severity = getattr(msg, 'severity', 0)
+        text = getattr(msg, 'text', '').strip()
+        timestamp = time.time()
+
+        # Parse detection messages (sent by Pi via MAVLink)
+        m = DET_RE.match(text)
+        if m:
+            try:
+                detection_data = {
+                    'detection_id': m['id'],
+                    'latitude': float(m['lat']),
+                    'longitude': float(m['lon']),
+                    'confidence': float(m['conf']),
+                    'detection_area': int(m['area']) if m['area'].isdigit() else 0,
+                    'timestamp': timestamp,
+                    'drone_id': self.drone_id,
+                    'source': 'mavlink_telemetry'
+                }
+                # Emit detection to Node.js server
+                self._forward_detection_to_server(detection_data)
+                logger.info(f"📡 Drone {self.drone_id} MAVLink Detection: {m['id']} at ({m['lat']}, {m['lon']})")
+            except Exception as e:
+                logger.error(f"Failed to parse detection message: {text}, error: {e}")
+
+        # Parse detection stats
+        elif m := DSTAT_RE.match(text):
+            logger.info("📊 Drone %s Detection Stats: Total=%s, Active=%s, Mission=%s",
+                        self.drone_id, m['total'], m['active'], m['mission'])
+
+        # Parse system stats
+        elif m := STAT_RE.match(text):
+            # Lazy %-formatting: debug is normally off, so the message is never built
+            logger.debug("💻 Drone %s Pi Stats: CPU=%s%% MEM=%s%% DISK=%s%% TEMP=%s°C",
+                         self.drone_id, m['cpu'], m['mem'], m['disk'], m['temp'])
+
+        # Store all STATUSTEXT messages
+        status_entry = {'severity': severity, 'text': text, 'timestamp': timestamp}
+        self.statustext_log.append(status_entry)
+        self._statustext_list = list(self.statustext_log)
+        # Log notable messages (severity < 4 is warning+)
+        if severity < 4:
+            statustext_logger.info("[%s] Drone %s STATUSTEXT: %s", severity, self.drone_id, text)
+    
+    # MAVLink message type -> handler, called by _telemetry_loop() under self.lock
+    _MSG_HANDLERS = {
+        'HEARTBEAT': _on_heartbeat,
+        'COMMAND_ACK': _on_command_ack,
+        'MISSION_CURRENT': _on_mission_current,
+        'GLOBAL_POSITION_INT': _on_global_position_int,
+        'ATTITUDE': _on_attitude,
+        'SYS_STATUS': _on_sys_status,
+        'GPS_RAW_INT': _on_gps_raw_int,
+        'VFR_HUD': _on_vfr_hud,
+        'STATUSTEXT': _on_statustext,
+    }
+    
+    def _pause_telemetry(self, timeout=0.3):
+        """Stop the telemetry loop reading the link so an upload can own it
+        
+        Returns as soon as the loop acknowledges the pause, or after timeout (e.g.
+        when no telemetry thread is running). Clear uploading_mission to resume.
+        """
+        self._telemetry_paused.clear()
+        self.uploading_mission = True
+        self._telemetry_paused.wait(timeout)
+    
+    def _wait_heartbeat(self, predicate, timeout):
+        """Wait for a HEARTBEAT (seen by the telemetry loop) whose state satisfies predicate
+        
+        Returns True as soon as a matching heartbeat arrives, False on timeout.
+        Only heartbeats received after the call are considered.
+        """
+        deadline = time.monotonic() + timeout
+        self._hb_event.clear()
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not self._hb_event.wait(remaining):
+                return False
+            self._hb_event.clear()
+            if predicate(self._last_hb):
+                return True
+    
+    def command_long(self, command, params=_ZERO_PARAMS):
+        """Send a COMMAND_LONG (confirmation 0) with seven params to the vehicle"""
+        self._cmd_long(self.target_sys, self.target_comp, command, 0, *params)
+    
+    def expect_ack(self, command):
+        """Register for the COMMAND_ACK of command; call before sending the command"""
+        slot = SimpleNamespace(event=threading.Event(), result=None)
+        self._pending_acks[command] = slot
+        return slot
+    
+    def wait_ack(self, command, slot, timeout):
+        """Wait for the ACK registered with expect_ack(); returns its result or None on timeout
+        
+        The telemetry loop delivers the ACK, so the caller never reads the link itself.
+        """
+        try:
+            if slot.event.wait(timeout):
+                return slot.result
+            return None
+        finally:
+            if self._pending_acks.get(command) is slot:
+                del self._pending_acks[command]
+    
+    def _wait_msg(self, types, timeout):
+        """Wait up to timeout seconds for a message of the given type(s)
+        
+        Sleeps in select() on the link between reads so it wakes as soon as
+        bytes arrive instead of polling on a fixed sleep. Non-matching messages
+        are discarded, as with recv_match(type=...).
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            msg = self.master.recv_match(type=types, blocking=False)
+            if msg is not None:
+                return msg
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            # Short slices: on Windows serial ports pymavlink's select() can only sleep
+            self.master.select(min(remaining, 0.05))
+    
+    def _drain_buffer(self, max_time=0.5):
+        """Discard every already-buffered message; returns how many were dropped
+        
+        Stops as soon as the link has nothing parsed or pending, or after max_time
+        seconds on a link that keeps streaming.
+        """
+        deadline = time.monotonic() + max_time
+        drained = 0
+        while self.master.recv_match(blocking=False) is not None:
+            drained += 1
+            if time.monotonic() >= deadline:
+                break
+        return drained
+    
+    def _request_mission_count(self, timeout):
+        """Ask for the stored mission's item count; returns the MISSION_COUNT or None on timeout
+        
+        The autopilot answers once it is done with the previous mission operation, so
+        this doubles as the sync point after a clear or an upload instead of a fixed
+        EEPROM delay.
+        """
+        self.master.mav.mission_request_list_send(
+            self.target_sys,
+            self.target_comp,
+            mavutil.mavlink.MAV_MISSION_TYPE_MISSION
+        )
+        return self._wait_msg('MISSION_COUNT', timeout)
+    
+    def _mode_name(self, msg):
+        """Decode flight mode name from a HEARTBEAT using the cached mode table"""
+        if msg.base_mode & CUSTOM_MODE_FLAG:
+            name = self._mode_names.get(msg.custom_mode)
+            if name is not None:
+                return name
+        return _mode_string(msg.autopilot, msg.type, msg.base_mode, msg.custom_mode)
+    
     def _simulation_loop(self):
         """Simulated telemetry updates for testing without hardware"""
         logger.info(f"🎮 Simulation loop started for Drone {self.drone_id}")
         
         while self.running and self.connected:
             try:
+                tick = 1.0  # Update every second
                 with self.lock:
                     # Simulate battery drain
-                    if self.telemetry['armed']:
-                        self.telemetry['battery_remaining'] = max(0, self.telemetry['battery_remaining'] - 0.01)
-                        self.telemetry['battery_voltage'] = 14.4 + (self.telemetry['battery_remaining'] / 100.0) * 2.4
+                    if self.telemetry.armed:
+                        self.telemetry.battery_remaining = max(0, self.telemetry.battery_remaining - 0.01)
+                        self.telemetry.battery_voltage = 14.4 + (self.telemetry.battery_remaining / 100.0) * 2.4
                     
                     # Simulate mission progress
-                    if self.mission_active and self.mission_waypoints:
+                    if self.mission_active and self._sim_targets:
                         # Move towards current waypoint
-                        if self.current_waypoint_index < len(self.mission_waypoints):
-                            target_wp = self.mission_waypoints[self.current_waypoint_index]
-                            target_lat = target_wp.get('latitude', target_wp.get('lat', 0))
-                            target_lon = target_wp.get('longitude', target_wp.get('lon', 0))
-                            target_alt = target_wp.get('altitude', target_wp.get('alt', 0))
+                        if self.current_waypoint_index < len(self._sim_targets):
+                            target_lat, target_lon, target_alt = self._sim_targets[self.current_waypoint_index]
                             
                             # Calculate distance to target
                             dist = self._distance_to_waypoint(target_lat, target_lon)
@@ -373,44 +978,45 @@ class DroneConnection:
                             # If close enough to waypoint, snap to it exactly
                             if dist <= speed_deg_per_sec * 1.5:  # Within 1.5 seconds of arrival
                                 # Snap directly to waypoint
-                                self.telemetry['latitude'] = target_lat
-                                self.telemetry['longitude'] = target_lon
-                                self.telemetry['relative_altitude'] = target_alt
-                                self.telemetry['groundspeed'] = 0
+                                self.telemetry.latitude = target_lat
+                                self.telemetry.longitude = target_lon
+                                self.telemetry.relative_altitude = target_alt
+                                self.telemetry.groundspeed = 0
                                 
-                                # Wait a moment at waypoint, then move to next
-                                time.sleep(0.1)
+                                # Wait a moment at waypoint (after releasing the lock), then move to next
+                                tick += 0.1
                                 self.current_waypoint_index += 1
-                                logger.info(f"🎯 Drone {self.drone_id} reached waypoint {self.current_waypoint_index}/{len(self.mission_waypoints)}")
+                                logger.info(f"🎯 Drone {self.drone_id} reached waypoint {self.current_waypoint_index}/{len(self._sim_targets)}")
                                 
-                                if self.current_waypoint_index >= len(self.mission_waypoints):
+                                if self.current_waypoint_index >= len(self._sim_targets):
                                     logger.info(f"✅ Mission completed for Drone {self.drone_id}")
                                     self.mission_active = False
-                                    self.telemetry['flight_mode'] = 'LOITER'
+                                    self.telemetry.flight_mode = 'LOITER'
                             else:
                                 # Move at constant speed towards target
                                 # Calculate unit direction vector
-                                direction_lat = (target_lat - self.telemetry['latitude']) / dist
-                                direction_lon = (target_lon - self.telemetry['longitude']) / dist
+                                direction_lat = (target_lat - self.telemetry.latitude) / dist
+                                direction_lon = (target_lon - self.telemetry.longitude) / dist
                                 
                                 # Move exactly speed_deg_per_sec in that direction
-                                self.telemetry['latitude'] += direction_lat * speed_deg_per_sec
-                                self.telemetry['longitude'] += direction_lon * speed_deg_per_sec
+                                self.telemetry.latitude += direction_lat * speed_deg_per_sec
+                                self.telemetry.longitude += direction_lon * speed_deg_per_sec
                                 
                                 # Smooth altitude change (20% per second)
-                                alt_diff = target_alt - self.telemetry['relative_altitude']
+                                alt_diff = target_alt - self.telemetry.relative_altitude
                                 if abs(alt_diff) < 0.5:
-                                    self.telemetry['relative_altitude'] = target_alt
+                                    self.telemetry.relative_altitude = target_alt
                                 else:
-                                    self.telemetry['relative_altitude'] += alt_diff * 0.2
+                                    self.telemetry.relative_altitude += alt_diff * 0.2
                                 
-                                self.telemetry['groundspeed'] = 2.5
+                                self.telemetry.groundspeed = 2.5
                         else:
-                            self.telemetry['groundspeed'] = 0
+                            self.telemetry.groundspeed = 0
                     
-                    self.telemetry['timestamp'] = time.time()
+                    self.telemetry.timestamp = time.time()
+                    self._publish_telemetry()
                 
-                time.sleep(1.0)  # Update every second
+                time.sleep(tick)
                 
             except Exception as e:
                 logger.error(f"Simulation loop error for Drone {self.drone_id}: {e}")
@@ -420,36 +1026,24 @@ class DroneConnection:
     
     def _distance_to_waypoint(self, target_lat, target_lon):
         """Calculate distance to waypoint in degrees (rough approximation)"""
-        dlat = target_lat - self.telemetry['latitude']
-        dlon = target_lon - self.telemetry['longitude']
-        return math.sqrt(dlat**2 + dlon**2)
+        return math.hypot(target_lat - self.telemetry.latitude, target_lon - self.telemetry.longitude)
+    
+    def _distance_m(self, target_lat, target_lon):
+        """Horizontal distance to a point in meters (equirectangular, fine over a few km)"""
+        t = self.telemetry
+        dlat = target_lat - t.latitude
+        dlon = (target_lon - t.longitude) * math.cos(math.radians(t.latitude))
+        return math.hypot(dlat, dlon) * self.METERS_PER_DEGREE
     
     def _forward_detection_to_server(self, detection_data):
         """Forward MAVLink detection data to Node.js server via Socket.IO"""
         try:
-            # For now, we'll store it in telemetry to be picked up by polling
-            # In production, you'd use WebSocket or direct HTTP POST to Node.js
-            if 'mavlink_detections' not in self.telemetry:
-                self.telemetry['mavlink_detections'] = []
-            
-            self.telemetry['mavlink_detections'].append(detection_data)
+            # Store it in telemetry to be picked up by polling
+            self.detection_log.append(detection_data)
+            self._detection_list = list(self.detection_log)
             
-            # Keep only last 50 detections
-            if len(self.telemetry['mavlink_detections']) > 50:
-                self.telemetry['mavlink_detections'] = self.telemetry['mavlink_detections'][-50:]
-            
-            # Also try to POST directly to Node.js server
-            try:
-                response = requests.post(
-                    'http://localhost:3000/api/mavlink-detection',
-                    json=detection_data,
-                    timeout=1
-                )
-                if response.status_code == 200:
-                    logger.debug(f"Detection forwarded to Node.js server: {detection_data['detection_id']}")
-            except Exception as e:
-                # Silently fail - telemetry polling will pick it up
-                pass
+            # Also POST it to the Node.js server, off the telemetry thread
+            queue_detection(detection_data)
                 
         except Exception as e:
             logger.error(f"Error forwarding detection: {e}")
@@ -460,32 +1054,32 @@ class DroneConnection:
             if self.simulation:
                 logger.info(f" Simulating ARM for Drone {self.drone_id}")
                 with self.lock:
-                    self.telemetry['armed'] = True
-                    self.telemetry['flight_mode'] = 'STABILIZE'
+                    self.telemetry.armed = True
+                    self.telemetry.flight_mode = 'STABILIZE'
+                    self._publish_telemetry()
                 logger.info(f" Simulated Drone {self.drone_id} armed")
                 return {'success': True, 'message': 'Drone armed (simulated)'}
             
-            current_armed = self.telemetry.get('armed', False)
+            current_armed = self.telemetry.armed
             if current_armed:
                 logger.info(f"✓ Drone {self.drone_id} already armed")
                 return {'success': True, 'message': 'Drone already armed'}
             
             # Ensure drone is in STABILIZE mode before arming
             # ArduPilot typically requires STABILIZE or GUIDED mode for arming
-            flight_mode = self.telemetry.get('flight_mode', '')
+            flight_mode = self.telemetry.flight_mode
             if flight_mode not in ['STABILIZE', 'GUIDED', 'LOITER']:
                 logger.info(f"Setting STABILIZE mode before arming (current: {flight_mode})")
+                # set_mode() returns once a HEARTBEAT confirms the mode, so no extra wait
                 if not self.set_mode('STABILIZE'):
                     logger.warning(f"Failed to set STABILIZE mode, trying to arm anyway...")
-                else:
-                    time.sleep(0.5)  # Wait for mode change
             
             # Check pre-arm conditions
-            gps_fix = self.telemetry.get('gps_fix_type', 0)
-            satellites = self.telemetry.get('satellites_visible', 0)
-            hdop = self.telemetry.get('hdop', 99.99)
-            battery_voltage = self.telemetry.get('battery_voltage', 0)
-            flight_mode = self.telemetry.get('flight_mode', '')
+            gps_fix = self.telemetry.gps_fix_type
+            satellites = self.telemetry.satellites_visible
+            hdop = self.telemetry.hdop
+            battery_voltage = self.telemetry.battery_voltage
+            flight_mode = self.telemetry.flight_mode
             
             # Log pre-arm status
             logger.info(f"Pre-arm check: GPS={gps_fix} ({satellites} sats), HDOP={hdop:.2f}, Battery={battery_voltage:.1f}V, Mode={flight_mode}")
@@ -507,18 +1101,12 @@ class DroneConnection:
             
             for attempt in range(3):
                 self.master.arducopter_arm()
-                time.sleep(0.5)  # Give it time to process
                 
-                # Verify arm status
-                for i in range(5):
-                    msg = self.master.recv_match(type='HEARTBEAT', timeout=0.2)
-                    if msg:
-                        is_armed = msg.base_mode & mavutil.mavlink.MAV_MODE_FLAG_SAFETY_ARMED != 0
-                        if is_armed:
-                            self.telemetry['armed'] = True
-                            logger.info(f" Drone {self.drone_id} armed successfully")
-                            return {'success': True, 'message': 'Drone armed successfully'}
-                    time.sleep(0.1)
+                # Verify arm status via heartbeats seen by the telemetry loop
+                if self._wait_heartbeat(lambda hb: hb['armed'], timeout=2.0):
+                    self.telemetry.armed = True
+                    logger.info(f" Drone {self.drone_id} armed successfully")
+                    return {'success': True, 'message': 'Drone armed successfully'}
                 
                 if attempt < 2:
                     logger.warning(f"  Arm verification attempt {attempt + 1} failed for Drone {self.drone_id}, retrying...")
@@ -535,7 +1123,7 @@ class DroneConnection:
                 error_msg += ". Issues: " + "; ".join(warnings)
             
             # Include recent STATUSTEXT messages for autopilot-specific failure reasons
-            recent_statustext = self.statustext_log[-5:] if self.statustext_log else []
+            recent_statustext = self._statustext_list[-5:]
             if recent_statustext:
                 statustext_msgs = [entry['text'] for entry in recent_statustext]
                 error_msg += ". Autopilot: " + "; ".join(statustext_msgs)
@@ -572,28 +1160,34 @@ class DroneConnection:
         return {'success': False, 'error': 'Disarm failed after 3 attempts'}
     
     def set_mode(self, mode_name):
-        """Set flight mode using Mission Planner's exact method: DO_SET_MODE command + SET_MODE message (twice)"""
+        """Set flight mode using Mission Planner's method: DO_SET_MODE command + SET_MODE message
+        
+        The SET_MODE message is repeated once if no HEARTBEAT confirms the mode within
+        SET_MODE_RESEND_AFTER seconds, instead of unconditionally after a 10ms sleep.
+        """
         try:
             if self.simulation:
                 logger.info(f" Simulating mode change to {mode_name} for Drone {self.drone_id}")
                 with self.lock:
-                    self.telemetry['flight_mode'] = mode_name.upper()
+                    self.telemetry.flight_mode = mode_name.upper()
+                    self._publish_telemetry()
                 logger.info(f" Simulated Drone {self.drone_id} mode: {mode_name}")
                 return True
             
-            # Get mode ID
-            if mode_name.upper() not in self.master.mode_mapping():
+            # Get mode ID from the table cached (upper-cased) on connect
+            target = mode_name.upper()
+            mode_id = self._mode_map.get(target)
+            if mode_id is None:
                 logger.error(f"Invalid mode: {mode_name}")
                 return False
             
-            mode_id = self.master.mode_mapping()[mode_name.upper()]
             logger.info(f"🚁 Setting mode {mode_name} (ID={mode_id}) for Drone {self.drone_id} - Mission Planner method")
             
             # **MISSION PLANNER METHOD: 3-step process**
             # Step 1: Send MAV_CMD_DO_SET_MODE command
             self.master.mav.command_long_send(
-                self.master.target_system,
-                self.master.target_component,
+                self.target_sys,
+                self.target_comp,
                 mavutil.mavlink.MAV_CMD_DO_SET_MODE,
                 0,  # confirmation
                 1,  # param1: mode flag (1 = custom mode enabled)
@@ -602,34 +1196,31 @@ class DroneConnection:
             )
             logger.info(f"📤 Sent MAV_CMD_DO_SET_MODE command")
             
-            # Step 2: Send SET_MODE message (first time)
+            # Step 2: Send SET_MODE message
             self.master.mav.set_mode_send(
-                self.master.target_system,
-                mavutil.mavlink.MAV_MODE_FLAG_CUSTOM_MODE_ENABLED,
+                self.target_sys,
+                CUSTOM_MODE_FLAG,
                 mode_id
             )
             logger.info(f"📤 Sent SET_MODE message #1")
             
-            # Step 3: Wait 10ms and send SET_MODE message again (Mission Planner does this!)
-            time.sleep(0.01)  # 10ms delay like Mission Planner
+            # Step 3: Verify via HEARTBEAT (up to 4 seconds); send SET_MODE a second
+            # time only if the mode isn't confirmed shortly after the first
+            matches = lambda hb: hb['custom_mode'] == mode_id
+            if self._wait_heartbeat(matches, timeout=self.SET_MODE_RESEND_AFTER):
+                logger.info(f"✅ Mode VERIFIED: {mode_name} (via HEARTBEAT)")
+                return True
+            
             self.master.mav.set_mode_send(
-                self.master.target_system,
-                mavutil.mavlink.MAV_MODE_FLAG_CUSTOM_MODE_ENABLED,
+                self.target_sys,
+                CUSTOM_MODE_FLAG,
                 mode_id
             )
-            logger.info(f"📤 Sent SET_MODE message #2 (10ms after first)")
-            
-            # Now verify mode change via HEARTBEAT
-            mode_verified = False
-            for attempt in range(20):  # Try up to 4 seconds (20 x 0.2s)
-                hb = self.master.recv_match(type='HEARTBEAT', timeout=0.2)
-                if hb:
-                    current_mode = mavutil.mode_string_v10(hb)
-                    if mode_name.upper() in current_mode.upper():
-                        logger.info(f"✅ Mode VERIFIED: {mode_name} (via HEARTBEAT)")
-                        mode_verified = True
-                        return True
-                time.sleep(0.05)
+            logger.info(f"📤 Sent SET_MODE message #2 (not confirmed after {self.SET_MODE_RESEND_AFTER}s)")
+            
+            if self._wait_heartbeat(matches, timeout=4.0 - self.SET_MODE_RESEND_AFTER):
+                logger.info(f"✅ Mode VERIFIED: {mode_name} (via HEARTBEAT)")
+                return True
             
             # If we get here, mode wasn't verified
             logger.warning(f"⚠️ Mode {mode_name} not verified after 4 seconds for Drone {self.drone_id}")
@@ -643,21 +1234,22 @@ class DroneConnection:
         """Takeoff to specified altitude with proper sequence"""
         try:
             # Check if armed
-            if not (self.telemetry.get('armed', False)):
+            if not self.telemetry.armed:
                 logger.warning(f"Drone {self.drone_id} not armed! Aborting takeoff.")
                 return False
             
             # Ensure we're in GUIDED mode
-            current_mode = self.telemetry.get('flight_mode', '')
+            current_mode = self.telemetry.flight_mode
             if 'GUIDED' not in current_mode.upper():
                 logger.info(f"Setting Drone {self.drone_id} to GUIDED mode before takeoff...")
+                # Returns once a HEARTBEAT confirms GUIDED (or after its own timeout)
                 self.set_mode('GUIDED')
-                time.sleep(1.0)  # Wait for mode change to take effect
             
-            # Send takeoff command
+            # Send takeoff command; its ACK is delivered by the telemetry loop
+            slot = self.expect_ack(mavutil.mavlink.MAV_CMD_NAV_TAKEOFF)
             self.master.mav.command_long_send(
-                self.master.target_system,
-                self.master.target_component,
+                self.target_sys,
+                self.target_comp,
                 mavutil.mavlink.MAV_CMD_NAV_TAKEOFF,
                 0,  # confirmation (will be confirmed by ack)
                 0,  # pitch (0 = no change)
@@ -671,20 +1263,14 @@ class DroneConnection:
             logger.info(f" Takeoff command sent to Drone {self.drone_id} (altitude={altitude}m)")
             
             # Wait for acknowledgment
-            ack_received = False
-            for i in range(10):
-                msg = self.master.recv_match(type='COMMAND_ACK', timeout=0.5)
-                if msg and msg.command == mavutil.mavlink.MAV_CMD_NAV_TAKEOFF:
-                    if msg.result == mavutil.mavlink.MAV_RESULT_ACCEPTED:
-                        logger.info(f" Takeoff ACK received for Drone {self.drone_id}")
-                        ack_received = True
-                        break
-                    else:
-                        logger.error(f" Takeoff command rejected: {msg.result}")
-                        return False
-            
-            if not ack_received:
+            result = self.wait_ack(mavutil.mavlink.MAV_CMD_NAV_TAKEOFF, slot, 5.0)
+            if result is None:
                 logger.warning(f" No immediate ACK for takeoff, but command was sent")
+            elif result == _MAV_ACCEPTED:
+                logger.info(f" Takeoff ACK received for Drone {self.drone_id}")
+            else:
+                logger.error(f" Takeoff command rejected: {result}")
+                return False
             
             return True
         except Exception as e:
@@ -693,10 +1279,11 @@ class DroneConnection:
     
     def land(self):
         """Land the drone"""
+        self._cancel_setpoint()
         try:
             self.master.mav.command_long_send(
-                self.master.target_system,
-                self.master.target_component,
+                self.target_sys,
+                self.target_comp,
                 mavutil.mavlink.MAV_CMD_NAV_LAND,
                 0,
                 0, 0, 0, 0, 0, 0, 0
@@ -709,6 +1296,7 @@ class DroneConnection:
     
     def rtl(self):
         """Return to launch"""
+        self._cancel_setpoint()
         try:
             self.set_mode('RTL')
             logger.info(f" RTL command sent to Drone {self.drone_id}")
@@ -717,30 +1305,75 @@ class DroneConnection:
             logger.error(f"Failed RTL for Drone {self.drone_id}: {e}")
             return False
     
+    @classmethod
+    def _coord_int(cls, degrees):
+        """Degrees to degE7, rounded to nearest (int() would truncate toward zero)"""
+        return round(degrees * cls.COORD_SCALE)
+    
+    def _cancel_setpoint(self):
+        """Stop re-sending the last goto() setpoint"""
+        stop, self._setpoint_stop = self._setpoint_stop, None
+        if stop is not None:
+            stop.set()
+        return stop is not None
+    
+    def _publish_setpoint(self, send, latitude, longitude, stop):
+        """Re-send a GUIDED setpoint at SETPOINT_RATE_HZ until it is reached or superseded
+        
+        ArduPilot and PX4 drop a GUIDED target that isn't refreshed, and a single
+        send over a lossy radio may never arrive.
+        """
+        interval = 1.0 / self.SETPOINT_RATE_HZ
+        sends = 1  # goto() sent the first one
+        while not stop.wait(interval):
+            if not (self.running and self.connected):
+                break
+            if 'GUIDED' not in self.telemetry.flight_mode.upper():
+                logger.info(f"Drone {self.drone_id} left GUIDED; stopped re-sending setpoint")
+                break
+            distance = self._distance_m(latitude, longitude)
+            if distance <= self.SETPOINT_REACHED_M:
+                logger.info(f"Drone {self.drone_id} reached ({latitude}, {longitude}) after {sends} setpoint sends")
+                break
+            try:
+                send()
+            except Exception as e:
+                logger.error(f"Failed to re-send setpoint to Drone {self.drone_id}: {e}")
+                break
+            sends += 1
+            logger.debug(f"Drone {self.drone_id} setpoint re-sent, {distance:.1f}m to go")
+        if self._setpoint_stop is stop:
+            self._setpoint_stop = None
+    
     def goto(self, latitude, longitude, altitude):
-        """Go to specific location in GUIDED mode"""
+        """Go to specific location in GUIDED mode
+        
+        The setpoint is sent once here and then re-sent by a background thread
+        (see _publish_setpoint) until the drone gets there.
+        """
         try:
             # Check if armed
-            if not self.telemetry.get('armed', False):
+            if not self.telemetry.armed:
                 logger.warning(f"Drone {self.drone_id} not armed! Cannot navigate.")
                 return False
             
             # Ensure we're in GUIDED mode
-            current_mode = self.telemetry.get('flight_mode', '')
+            current_mode = self.telemetry.flight_mode
             if 'GUIDED' not in current_mode.upper():
                 logger.info(f"Setting Drone {self.drone_id} to GUIDED mode for navigation...")
+                # Returns once a HEARTBEAT confirms GUIDED (or after its own timeout)
                 self.set_mode('GUIDED')
-                time.sleep(1.0)  # Wait for mode change
             
             # Send position target (this is the proper way for GUIDED mode navigation)
-            self.master.mav.set_position_target_global_int_send(
+            send = functools.partial(
+                self.master.mav.set_position_target_global_int_send,
                 0,  # time_boot_ms (not used)
-                self.master.target_system,
-                self.master.target_component,
+                self.target_sys,
+                self.target_comp,
                 mavutil.mavlink.MAV_FRAME_GLOBAL_RELATIVE_ALT_INT,
                 0b0000111111111000,  # type_mask (only positions enabled)
-                int(latitude * 1e7),   # lat_int - latitude in degrees * 1E7
-                int(longitude * 1e7),  # lon_int - longitude in degrees * 1E7
+                self._coord_int(latitude),   # lat_int - latitude in degrees * 1E7
+                self._coord_int(longitude),  # lon_int - longitude in degrees * 1E7
                 altitude,              # alt - altitude in meters (AMSL or relative)
                 0,  # vx - X velocity in m/s (not used)
                 0,  # vy - Y velocity in m/s (not used)
@@ -751,7 +1384,17 @@ class DroneConnection:
                 0,  # yaw - yaw setpoint in radians (not used)
                 0   # yaw_rate - yaw rate setpoint in rad/s (not used)
             )
+            send()
             logger.info(f" Navigate command sent to Drone {self.drone_id}: ({latitude}, {longitude}) @ {altitude}m")
+            
+            # Only one setpoint is followed at a time: the new one replaces any still being re-sent
+            if self._cancel_setpoint():
+                logger.warning(f"Drone {self.drone_id}: previous goto target replaced before it was reached")
+            stop = threading.Event()
+            self._setpoint_stop = stop
+            threading.Thread(
+                target=self._publish_setpoint, args=(send, latitude, longitude, stop), daemon=True
+            ).start()
             return True
         except Exception as e:
             logger.error(f"Failed to navigate Drone {self.drone_id}: {e}")
@@ -766,55 +1409,38 @@ class DroneConnection:
         Returns: List of waypoint dicts ready for upload
         """
         waypoints = []
-        lines = waypoints_content.strip().split('\n')
+        content = waypoints_content.strip()
         
-        # Check header
-        if not lines or 'QGC WPL' not in lines[0]:
+        # Check header before splitting, so a wrong file is rejected without scanning it
+        if not content.startswith('QGC WPL'):
             logger.error("Invalid .waypoints file: missing QGC WPL header")
             return None
         
         # Parse waypoints (skip header line 0)
-        for line_num, line in enumerate(lines[1:], start=1):
-            parts = line.strip().split('\t')
+        lines = content.splitlines()
+        for line_num, line in enumerate(itertools.islice(lines, 1, None), start=1):
+            # Split at most 12 times: anything past the 12th column stays in one unused part
+            parts = line.strip().split('\t', 12)
             if len(parts) < 12:
                 logger.warning(f"Skipping malformed line {line_num}: {line}")
                 continue
             
             try:
-                seq = int(parts[0])
-                current = int(parts[1])
-                frame = int(parts[2])
-                command = int(parts[3])
-                param1 = float(parts[4])
-                param2 = float(parts[5])
-                param3 = float(parts[6])
-                param4 = float(parts[7])
-                lat = float(parts[8])
-                lon = float(parts[9])
-                alt = float(parts[10])
-                autocontinue = int(parts[11])
-                
-                # Convert frame number to MAVLink constant
-                frame_map = {
-                    0: mavutil.mavlink.MAV_FRAME_GLOBAL,
-                    3: mavutil.mavlink.MAV_FRAME_GLOBAL_RELATIVE_ALT,
-                    6: mavutil.mavlink.MAV_FRAME_GLOBAL_RELATIVE_ALT_INT
-                }
-                frame_const = frame_map.get(frame, mavutil.mavlink.MAV_FRAME_GLOBAL_RELATIVE_ALT)
+                seq, current, frame, command, param1, param2, param3, param4, lat, lon, alt, autocontinue = parts[:12]
                 
                 waypoints.append({
-                    'seq': seq,
-                    'current': current,
-                    'frame': frame_const,
-                    'command': command,
-                    'param1': param1,
-                    'param2': param2,
-                    'param3': param3,
-                    'param4': param4,
-                    'latitude': lat,
-                    'longitude': lon,
-                    'altitude': alt,
-                    'autocontinue': autocontinue
+                    'seq': int(seq),
+                    'current': int(current),
+                    'frame': WPL_FRAMES.get(int(frame), WPL_DEFAULT_FRAME),
+                    'command': int(command),
+                    'param1': float(param1),
+                    'param2': float(param2),
+                    'param3': float(param3),
+                    'param4': float(param4),
+                    'latitude': float(lat),
+                    'longitude': float(lon),
+                    'altitude': float(alt),
+                    'autocontinue': int(autocontinue)
                 })
                 
             except (ValueError, IndexError) as e:
@@ -859,8 +1485,7 @@ class DroneConnection:
             
             # Pause telemetry
             logger.info(f"⏸️  Pausing telemetry loop...")
-            self.uploading_mission = True
-            time.sleep(0.3)
+            self._pause_telemetry()
             
             try:
                 # Clear existing mission
@@ -868,8 +1493,8 @@ class DroneConnection:
                 clear_confirmed = False
                 for attempt in range(3):
                     self.master.mav.mission_clear_all_send(
-                        self.master.target_system,
-                        self.master.target_component,
+                        self.target_sys,
+                        self.target_comp,
                         mavutil.mavlink.MAV_MISSION_TYPE_MISSION
                     )
                     
@@ -884,23 +1509,44 @@ class DroneConnection:
                     logger.error("❌ Failed to clear mission after 3 attempts")
                     return False
                 
-                time.sleep(4.0)  # EEPROM clear delay
+                # Wait (up to the old 4s EEPROM clear delay) for the autopilot to answer
+                # a count request, i.e. until it is done clearing
+                if self._request_mission_count(4.0) is None:
+                    logger.warning("⚠️ No MISSION_COUNT after clear within 4s, uploading anyway")
                 
-                # Send mission count
+                # Send mission count; its item requests are waited for below
                 self.master.mav.mission_count_send(
-                    self.master.target_system,
-                    self.master.target_component,
+                    self.target_sys,
+                    self.target_comp,
                     len(waypoints),
                     mavutil.mavlink.MAV_MISSION_TYPE_MISSION
                 )
                 logger.info(f"📤 Mission count sent: {len(waypoints)} items")
-                time.sleep(0.5)
+                
+                # MISSION_ITEM arguments per seq, pulled out of the dicts once rather than
+                # field by field on every request
+                tsys = self.target_sys
+                tcmp = self.target_comp
+                item_args = [
+                    (wp['seq'], wp['frame'], wp['command'], wp['current'], wp['autocontinue'],
+                     wp['param1'], wp['param2'], wp['param3'], wp['param4'],
+                     wp['latitude'], wp['longitude'], wp['altitude'])
+                    for wp in waypoints
+                ]
+                # Encoded MISSION_ITEM per seq, built on first request and reused on resends;
+                # mav.send() still re-packs it so each frame gets a fresh sequence number
+                encode_item = self.master.mav.mission_item_encode
+                send_msg = self.master.mav.send
+                encoded = {}
                 
                 # Upload each waypoint
                 waypoints_sent = {}
                 wp_index = 0
                 timeout_count = 0
                 max_timeouts = 5
+                resends = 0
+                upload_started = time.monotonic()
+                log_items = logger.isEnabledFor(logging.DEBUG)
                 
                 while wp_index < len(waypoints) and timeout_count < max_timeouts:
                     msg = self.master.recv_match(type=['MISSION_REQUEST_INT', 'MISSION_REQUEST', 'HEARTBEAT'], 
@@ -923,48 +1569,52 @@ class DroneConnection:
                             break
                         
                         if req_seq in waypoints_sent:
+                            resends += 1
                             logger.warning(f" Resending waypoint {req_seq} (already sent)")
                         
-                        # Get waypoint from parsed file
-                        wp = waypoints[req_seq]
-                        
-                        # Send using mission_item_send (matches Mission Planner)
-                        self.master.mav.mission_item_send(
-                            self.master.target_system,
-                            self.master.target_component,
-                            wp['seq'],
-                            wp['frame'],
-                            wp['command'],
-                            wp['current'],
-                            wp['autocontinue'],
-                            wp['param1'], wp['param2'], wp['param3'], wp['param4'],
-                            wp['latitude'], wp['longitude'], wp['altitude']
-                        )
+                        # Send as MISSION_ITEM (matches Mission Planner)
+                        args = item_args[req_seq]
+                        item = encoded.get(req_seq)
+                        if item is None:
+                            item = encoded[req_seq] = encode_item(tsys, tcmp, *args)
+                        send_msg(item)
                         
                         waypoints_sent[req_seq] = True
                         if req_seq == wp_index:
                             wp_index += 1
                         
-                        cmd_names = {16: "HOME" if req_seq == 0 else "WAYPOINT", 22: "TAKEOFF", 178: "CHANGE_SPEED", 20: "RTL"}
-                        cmd_name = cmd_names.get(wp['command'], f"CMD_{wp['command']}")
-                        logger.info(f"  {cmd_name} {req_seq+1}/{len(waypoints)} uploaded (seq={req_seq})")
-                        time.sleep(0.05)
+                        # Per-item detail only at DEBUG; a summary follows the loop
+                        if log_items:
+                            command = args[2]
+                            if req_seq == 0 and command == 16:
+                                cmd_name = "HOME"
+                            else:
+                                cmd_name = MISSION_COMMAND_NAMES.get(command, f"CMD_{command}")
+                            logger.debug("  %s %d/%d uploaded (seq=%d)", cmd_name, req_seq + 1, len(waypoints), req_seq)
+                
+                logger.info(f"📤 Sent {len(waypoints_sent)}/{len(waypoints)} items in "
+                            f"{time.monotonic() - upload_started:.1f}s ({resends} resends)")
                 
                 # Wait for mission ACK
                 logger.info(f"⏳ Waiting for mission ACK...")
                 ack_received = False
-                for attempt in range(5):
-                    ack = self.master.recv_match(type='MISSION_ACK', blocking=True, timeout=3.0)
-                    if ack:
-                        if ack.type == mavutil.mavlink.MAV_MISSION_ACCEPTED:
-                            logger.info(f" Mission ACK received: ACCEPTED")
-                            ack_received = True
-                            break
-                        else:
-                            logger.error(f" Mission ACK: {ack.type}")
+                deadline = time.monotonic() + 15.0
+                while not ack_received:
+                    remaining = deadline - time.monotonic()
+                    ack = self._wait_msg('MISSION_ACK', remaining) if remaining > 0 else None
+                    if ack is None:
+                        break
+                    if ack.type == mavutil.mavlink.MAV_MISSION_ACCEPTED:
+                        logger.info(f" Mission ACK received: ACCEPTED")
+                        ack_received = True
+                    else:
+                        logger.error(f" Mission ACK: {ack.type}")
                 
                 if ack_received:
-                    time.sleep(2.0)  # EEPROM write delay
+                    # EEPROM write: proceed once the autopilot answers a count request (max 2s)
+                    count_msg = self._request_mission_count(2.0)
+                    if count_msg is not None and count_msg.count != len(waypoints):
+                        logger.warning(f"⚠️ Drone reports {count_msg.count} items after upload, expected {len(waypoints)}")
                     
                     # CRITICAL: Store waypoints for start_mission() to work
                     # Extract survey waypoints (command 16, not HOME/TAKEOFF/RTL)
@@ -994,8 +1644,48 @@ class DroneConnection:
             self.uploading_mission = False
             return False
     
+    @staticmethod
+    def _mission_item_fields(seq, wp):
+        """Normalize a waypoint dict (either key spelling) into a MissionItem"""
+        # Determine command type (handle both string names and integer IDs)
+        cmd_input = wp.get('command', mavutil.mavlink.MAV_CMD_NAV_WAYPOINT)
+        if isinstance(cmd_input, str):
+            cmd = MISSION_COMMANDS.get(cmd_input.upper(), mavutil.mavlink.MAV_CMD_NAV_WAYPOINT)
+            logger.debug(f"  Converted command string '{cmd_input}' to ID {cmd}")
+        else:
+            cmd = int(cmd_input)
+        
+        # Get coordinates - ensure they're floats for proper conversion
+        lat = float(wp.get('latitude', wp.get('lat', 0)))
+        lon = float(wp.get('longitude', wp.get('lon', 0)))
+        alt = float(wp.get('altitude', wp.get('alt', 0)))
+        
+        # Get waypoint parameters with command-specific defaults
+        # For TAKEOFF: param1=min_pitch, param2=empty, param3=empty, param4=yaw
+        # For WAYPOINT: param1=hold_time, param2=accept_radius, param3=pass_radius, param4=yaw
+        param1 = float(wp.get('param1', wp.get('delay', 0)))
+        param2 = float(wp.get('param2', wp.get('acceptance_radius', 0)))
+        param3 = float(wp.get('param3', wp.get('pass_radius', 0)))
+        # NaN yaw means "don't change yaw" and survives float() unchanged
+        param4 = float(wp.get('param4', wp.get('yaw', 0)))
+        
+        # Get autocontinue flag (default 1)
+        autocontinue = int(wp.get('autocontinue', 1))
+        
+        # CRITICAL: Use frame 3 (GLOBAL_RELATIVE_ALT) like Mission Planner
+        # Frame 3 = coordinates in degrees (float), NOT E7 integer format
+        # HOME (seq 0) uses altitude AMSL, others use relative altitude
+        if seq == 0:
+            frame = mavutil.mavlink.MAV_FRAME_GLOBAL
+        else:
+            frame = mavutil.mavlink.MAV_FRAME_GLOBAL_RELATIVE_ALT
+        
+        return MissionItem(frame, cmd, autocontinue, param1, param2, param3, param4, lat, lon, alt)
+    
     def upload_mission_waypoints(self, waypoints):
         """Upload mission waypoints to drone (or simulate)"""
+        # The upload owns the link; stop goto() re-sending into it
+        self._cancel_setpoint()
         try:
             if not waypoints:
                 logger.error("No waypoints provided")
@@ -1003,14 +1693,18 @@ class DroneConnection:
             
             self.mission_waypoints = waypoints
             
+            # Normalize the survey waypoints once (they follow HOME, TAKEOFF and NAV at seq 0-2);
+            # everything below reads these instead of re-probing 'latitude'/'lat' etc.
+            survey_items = [self._mission_item_fields(seq, wp) for seq, wp in enumerate(waypoints, start=3)]
+            
             # Get first survey point coordinates and altitude
-            first_lat = waypoints[0].get('latitude', waypoints[0].get('lat', 0))
-            first_lon = waypoints[0].get('longitude', waypoints[0].get('lon', 0))
+            first_lat = survey_items[0].lat
+            first_lon = survey_items[0].lon
             survey_alt = waypoints[0].get('altitude', waypoints[0].get('alt', 30))
             
             # Get current drone position (will be used as takeoff point)
-            current_lat = self.telemetry.get('latitude', first_lat)
-            current_lon = self.telemetry.get('longitude', first_lon)
+            current_lat = self.telemetry.latitude
+            current_lon = self.telemetry.longitude
             
             logger.info(f"Mission sequence (Mission Planner format):")
             logger.info(f"  0. HOME at current position ({current_lat:.6f}, {current_lon:.6f})")
@@ -1024,7 +1718,7 @@ class DroneConnection:
             home_waypoint = {
                 'latitude': current_lat,  # Current drone position
                 'longitude': current_lon,  # Current drone position
-                'altitude': self.telemetry.get('altitude', 633.31),  # Current altitude (AMSL)
+                'altitude': self.telemetry.altitude,  # Current altitude (AMSL)
                 'command': mavutil.mavlink.MAV_CMD_NAV_WAYPOINT,  # HOME uses NAV_WAYPOINT
                 'param1': 0,
                 'param2': 0,
@@ -1082,13 +1776,16 @@ class DroneConnection:
             
             logger.info(f" Uploading {len(full_mission)} waypoints (HOME + TAKEOFF + NAV + {len(waypoints)} survey + RTL) to Drone {self.drone_id}")
             
+            # Convert every item to its MISSION_ITEM fields up front so the request loop
+            # only indexes precomputed tuples between reads
+            items = ([self._mission_item_fields(seq, wp) for seq, wp in enumerate(full_mission[:3])]
+                     + survey_items
+                     + [self._mission_item_fields(len(full_mission) - 1, rtl_waypoint)])
+            
             if self.simulation:
-                logger.info(f" SIMULATION: Pretending to upload {len(full_mission)} waypoints...")
-                # Simulate upload delay
-                for i, wp in enumerate(full_mission):
-                    if i % 10 == 0:  # Log every 10th waypoint
-                        logger.info(f"  Simulated upload: waypoint {i+1}/{len(full_mission)}")
-                    time.sleep(0.01)  # Small delay to simulate upload time
+                # One bounded delay for the whole upload instead of sleeping per waypoint
+                logger.info(" SIMULATION: Simulated upload of %d waypoints in bulk", len(full_mission))
+                time.sleep(min(0.1, len(full_mission) * 0.001))
                 
                 logger.info(f" Simulated mission upload successful for Drone {self.drone_id}")
                 return True
@@ -1096,20 +1793,12 @@ class DroneConnection:
             # CRITICAL: Pause telemetry loop BEFORE mission operations to prevent message conflicts
             # The telemetry thread would consume MISSION_ACK messages needed for upload verification
             logger.info(f"⏸️  Pausing telemetry loop to avoid message conflicts...")
-            self.uploading_mission = True
-            time.sleep(0.3)  # Give telemetry thread time to pause
+            self._pause_telemetry()
             
             try:
                 # Drain any pending messages before starting mission operations
                 logger.info(f"📥 Draining message buffer before mission clear...")
-                drain_start = time.time()
-                drained_count = 0
-                while time.time() - drain_start < 0.5:
-                    msg = self.master.recv_match(blocking=False, timeout=0.1)
-                    if msg is None:
-                        break
-                    drained_count += 1
-                logger.info(f"📥 Drained {drained_count} buffered messages")
+                logger.info(f"📥 Drained {self._drain_buffer()} buffered messages")
                 
                 # Clear existing mission (modern MAVLink protocol)
                 logger.info(f"📥 Clearing existing mission from drone...")
@@ -1119,8 +1808,8 @@ class DroneConnection:
                 
                 while not clear_confirmed and clear_attempts < max_clear_attempts:
                     self.master.mav.mission_clear_all_send(
-                        self.master.target_system,
-                        self.master.target_component,
+                        self.target_sys,
+                        self.target_comp,
                         mavutil.mavlink.MAV_MISSION_TYPE_MISSION
                     )
                     clear_attempts += 1
@@ -1129,15 +1818,18 @@ class DroneConnection:
                     # Wait for MISSION_ACK indicating mission was cleared
                     # Increased timeout for Pixhawk 2.4.8 (older hardware may be slower)
                     ack_received = False
-                    for i in range(8):  # 8 attempts x 1.5s = 12 seconds total timeout
-                        msg = self.master.recv_match(type='MISSION_ACK', blocking=True, timeout=1.5)
-                        if msg:
-                            logger.info(f"📥 Received MISSION_ACK: type={msg.type} (0=ACCEPTED)")
-                            if msg.type == mavutil.mavlink.MAV_MISSION_ACCEPTED:
-                                logger.info(f"✅ Mission cleared successfully (attempt {clear_attempts}, ACK after {(i+1)*1.5:.1f}s)")
-                                clear_confirmed = True
-                                ack_received = True
-                                break
+                    sent_at = time.monotonic()
+                    deadline = sent_at + 12.0
+                    while not ack_received:
+                        remaining = deadline - time.monotonic()
+                        msg = self._wait_msg('MISSION_ACK', remaining) if remaining > 0 else None
+                        if msg is None:
+                            break
+                        logger.info(f"📥 Received MISSION_ACK: type={msg.type} (0=ACCEPTED)")
+                        if msg.type == mavutil.mavlink.MAV_MISSION_ACCEPTED:
+                            logger.info(f"✅ Mission cleared successfully (attempt {clear_attempts}, ACK after {time.monotonic() - sent_at:.1f}s)")
+                            clear_confirmed = True
+                            ack_received = True
                     
                     if not ack_received and clear_attempts < max_clear_attempts:
                         logger.warning(f"⚠️ Mission clear ACK not received after 12s, retrying... (attempt {clear_attempts}/{max_clear_attempts})")
@@ -1151,13 +1843,7 @@ class DroneConnection:
                 
                 # CRITICAL: Verify mission was actually cleared by requesting mission count
                 logger.info(f"🔍 Verifying mission is empty (requesting mission count)...")
-                self.master.mav.mission_request_list_send(
-                    self.master.target_system,
-                    self.master.target_component,
-                    mavutil.mavlink.MAV_MISSION_TYPE_MISSION
-                )
-                
-                count_msg = self.master.recv_match(type='MISSION_COUNT', blocking=True, timeout=3.0)
+                count_msg = self._request_mission_count(3.0)
                 if count_msg:
                     if count_msg.count == 0:
                         logger.info(f"✅ Verified mission is empty (count=0)")
@@ -1169,41 +1855,84 @@ class DroneConnection:
                 else:
                     logger.warning(f"⚠️ Could not verify mission count after clear (timeout)")
                 
-                time.sleep(0.5)  # Delay to ensure EEPROM write completes
-                
                 # Drain any pending messages before starting waypoint upload
                 logger.info(f"📥 Draining message buffer before waypoint upload...")
-                drain_timeout = time.time()
-                drained_count_2 = 0
-                while time.time() - drain_timeout < 0.5:
-                    msg = self.master.recv_match(blocking=False, timeout=0.1)
-                    if msg is None:
-                        break
-                    drained_count_2 += 1
-                logger.info(f"📥 Drained {drained_count_2} buffered messages before waypoint upload")
+                logger.info(f"📥 Drained {self._drain_buffer()} buffered messages before waypoint upload")
                 
                 # Send waypoint count (modern MAVLink protocol)
                 self.master.mav.mission_count_send(
-                    self.master.target_system,
-                    self.master.target_component,
+                    self.target_sys,
+                    self.target_comp,
                     len(full_mission),
                     mavutil.mavlink.MAV_MISSION_TYPE_MISSION
                 )
                 logger.info(f"📤 Mission count sent: {len(full_mission)} waypoints (seq 0=HOME, seq 1=TAKEOFF)")
-                time.sleep(0.5)  # Increased wait time for drone to process count
                 
-                # Upload each waypoint using MAVLink 2 (mission_item_int)
-                waypoints_sent = {}  # Track which waypoints we've already sent
+                # Upload is driven purely by the drone's MISSION_REQUEST(_INT) messages:
+                # each request is answered as soon as it arrives, no fixed delays
+                waypoints_sent = {}  # seq -> time we last sent it
                 wp_index = 0
                 timeout_count = 0
                 max_timeouts = 5  # Increased from 3 to 5
                 count_resend_attempts = 0
                 max_count_resends = 2
+                batch = _BatchWriter(self.master)
                 
-                while wp_index < len(full_mission) and timeout_count < max_timeouts:
+                # Bind what the request loop touches on every item to locals once
+                tsys = self.target_sys
+                tcmp = self.target_comp
+                encode_item = self.master.mav.mission_item_encode
+                send_msg = self.master.mav.send
+                # Encoded MISSION_ITEM per seq, reused when the drone re-requests an item.
+                # The frame itself is re-packed on every send: a cached byte blob would
+                # replay a stale packet sequence number (and signature on signed links).
+                encoded = {}
+                item_timeout = self.mission_item_timeout
+                # MISSION_ACK can end the upload early (an error, or a pipelining autopilot
+                # that accepted every prefetched item without requesting the tail)
+                request_types = ['MISSION_REQUEST_INT', 'MISSION_REQUEST', 'MISSION_ACK']
+                last_seq = len(full_mission) - 1
+                window = self.mission_upload_window or len(full_mission)
+                next_to_send = 0  # Lowest seq not yet sent at least once
+                early_ack = None
+                log_progress = logger.isEnabledFor(logging.INFO)
+                resends = 0
+                upload_started = time.monotonic()
+                
+                def send(seq):
+                    msg = encoded.get(seq)
+                    if msg is None:
+                        # Fields were converted once before the upload; just index them here
+                        frame, cmd, autocontinue, param1, param2, param3, param4, lat, lon, alt = items[seq]
+                        
+                        # Use MISSION_ITEM (NOT mission_item_int) to match Mission Planner
+                        # Mission Planner uses the non-INT version with float coordinates
+                        msg = encoded[seq] = encode_item(
+                            tsys,
+                            tcmp,
+                            seq,  # Sequence number
+                            frame,  # Frame type
+                            cmd,  # Command ID
+                            0,  # current (0=not current, 1=current for HOME)
+                            autocontinue,  # autocontinue
+                            param1, param2, param3, param4,  # Command parameters
+                            lat, lon,  # Latitude/Longitude in degrees (float)
+                            alt  # Altitude in meters (float)
+                        )
+                    send_msg(msg)
+                    
+                    # Mark this waypoint as sent
+                    waypoints_sent[seq] = time.time()
+                    
+                    # Log every 25th item (and the special ones) so logging doesn't pace the upload
+                    if log_progress and (seq < 3 or seq % 25 == 0 or seq == last_seq):
+                        cmd_name = "HOME" if seq == 0 else MISSION_COMMAND_NAMES.get(items[seq].command, "WAYPOINT")
+                        logger.info("  %s %d/%d uploaded (seq=%d)", cmd_name, seq + 1, last_seq + 1, seq)
+                
+                while wp_index < len(full_mission) and early_ack is None and timeout_count < max_timeouts:
                     # Wait for waypoint request (INT version for MAVLink 2)
                     # Use longer timeout to handle slow drone responses
-                    msg = self.master.recv_match(type=['MISSION_REQUEST_INT', 'MISSION_REQUEST', 'HEARTBEAT'], blocking=True, timeout=15)
+                    msg = self._wait_msg(request_types, item_timeout)
                     
                     if msg is None:
                         # Timeout occurred - drone hasn't requested first waypoint yet
@@ -1215,163 +1944,106 @@ class DroneConnection:
                             count_resend_attempts += 1
                             logger.info(f"🔄 Resending mission count (attempt {count_resend_attempts}/{max_count_resends})...")
                             self.master.mav.mission_count_send(
-                                self.master.target_system,
-                                self.master.target_component,
+                                tsys,
+                                tcmp,
                                 len(full_mission),
                                 mavutil.mavlink.MAV_MISSION_TYPE_MISSION
                             )
-                            time.sleep(1.0)  # Wait longer after resend
                             continue  # Don't increment timeout_count for resend
                         
                         if timeout_count >= max_timeouts:
                             logger.error(f"❌ Waypoint upload timeout after {max_timeouts} attempts on waypoint {wp_index}")
                             return False
-                        time.sleep(0.5)
                         continue
                     
-                    # Check for request messages
-                    if msg.get_type() in ['MISSION_REQUEST_INT', 'MISSION_REQUEST']:
-                        req_seq = msg.seq
-                        timeout_count = 0  # Reset timeout counter on successful request
-                        count_resend_attempts = 0  # Reset count resend attempts
-                        
-                        # Handle out-of-order requests by resending previous waypoints if needed
-                        if req_seq < wp_index and req_seq in waypoints_sent:
-                            logger.info(f"  Re-sending waypoint {req_seq+1}/{len(full_mission)} (drone requested it again)")
-                            wp = full_mission[req_seq]
-                        elif req_seq == wp_index:
-                            # Normal sequential request
-                            wp = full_mission[wp_index]
-                        elif req_seq > wp_index:
-                            # Drone jumped ahead - this shouldn't happen, log it
-                            logger.warning(f"⚠️  Drone requested waypoint {req_seq} but we're at {wp_index}, jumping ahead")
-                            wp_index = req_seq
-                            wp = full_mission[wp_index]
-                        else:
-                            # Out of sequence, skip
-                            continue
-                        
-                        # Determine command type (handle both string names and integer IDs)
-                        cmd_input = wp.get('command', mavutil.mavlink.MAV_CMD_NAV_WAYPOINT)
-                        
-                        # Map string command names to integer IDs if needed
-                        command_map = {
-                            'TAKEOFF': mavutil.mavlink.MAV_CMD_NAV_TAKEOFF,
-                            'NAV_TAKEOFF': mavutil.mavlink.MAV_CMD_NAV_TAKEOFF,
-                            'WAYPOINT': mavutil.mavlink.MAV_CMD_NAV_WAYPOINT,
-                            'NAV_WAYPOINT': mavutil.mavlink.MAV_CMD_NAV_WAYPOINT,
-                            'RTL': mavutil.mavlink.MAV_CMD_NAV_RETURN_TO_LAUNCH,
-                            'RETURN_TO_LAUNCH': mavutil.mavlink.MAV_CMD_NAV_RETURN_TO_LAUNCH,
-                            'NAV_RETURN_TO_LAUNCH': mavutil.mavlink.MAV_CMD_NAV_RETURN_TO_LAUNCH,
-                        }
-                        
-                        if isinstance(cmd_input, str):
-                            cmd = command_map.get(cmd_input.upper(), mavutil.mavlink.MAV_CMD_NAV_WAYPOINT)
-                            logger.debug(f"  Converted command string '{cmd_input}' to ID {cmd}")
-                        else:
-                            cmd = int(cmd_input)
-                        
-                        # Get coordinates - ensure they're floats for proper conversion
-                        lat = float(wp.get('latitude', wp.get('lat', 0)))
-                        lon = float(wp.get('longitude', wp.get('lon', 0)))
-                        alt = float(wp.get('altitude', wp.get('alt', 0)))
-                        
-                        # Get waypoint parameters with command-specific defaults
-                        # For TAKEOFF: param1=min_pitch, param2=empty, param3=empty, param4=yaw
-                        # For WAYPOINT: param1=hold_time, param2=accept_radius, param3=pass_radius, param4=yaw
-                        param1 = float(wp.get('param1', wp.get('delay', 0)))
-                        param2 = float(wp.get('param2', wp.get('acceptance_radius', 0)))
-                        param3 = float(wp.get('param3', wp.get('pass_radius', 0)))
-                        param4 = wp.get('param4', wp.get('yaw', 0))
-                        # Handle NaN for yaw (means "don't change yaw")
-                        if isinstance(param4, float) and (param4 != param4):  # NaN check
-                            param4_float = float('nan')
-                        else:
-                            param4_float = float(param4)
-                        
-                        # Get autocontinue flag (default 1)
-                        autocontinue = int(wp.get('autocontinue', 1))
-                        
-                        # CRITICAL: Use frame 3 (GLOBAL_RELATIVE_ALT) like Mission Planner
-                        # Frame 3 = coordinates in degrees (float), NOT E7 integer format
-                        # HOME (seq 0) uses altitude AMSL, others use relative altitude
-                        if req_seq == 0:  # HOME waypoint uses AMSL altitude
-                            frame = mavutil.mavlink.MAV_FRAME_GLOBAL
-                        else:  # All other waypoints use relative altitude
-                            frame = mavutil.mavlink.MAV_FRAME_GLOBAL_RELATIVE_ALT
-                        
-                        # Use mission_item_send (NOT mission_item_int) to match Mission Planner
-                        # Mission Planner uses the non-INT version with float coordinates
-                        self.master.mav.mission_item_send(
-                            self.master.target_system,
-                            self.master.target_component,
-                            req_seq,  # Sequence number
-                            frame,  # Frame type
-                            cmd,  # Command ID
-                            0,  # current (0=not current, 1=current for HOME)
-                            autocontinue,  # autocontinue
-                            param1, param2, param3, param4_float,  # Command parameters
-                            lat, lon,  # Latitude/Longitude in degrees (float)
-                            alt  # Altitude in meters (float)
-                        )
-                        
-                        # Mark this waypoint as sent
-                        waypoints_sent[req_seq] = True
-                        
-                        # Only advance wp_index if this is the next expected waypoint
-                        if req_seq == wp_index:
-                            wp_index += 1
-                        
-                        cmd_name = {
-                            mavutil.mavlink.MAV_CMD_NAV_TAKEOFF: "TAKEOFF",
-                            mavutil.mavlink.MAV_CMD_NAV_WAYPOINT: "WAYPOINT" if req_seq > 0 else "HOME",
-                            mavutil.mavlink.MAV_CMD_NAV_RETURN_TO_LAUNCH: "RTL"
-                        }.get(cmd, "WAYPOINT")
-                        if req_seq == 0:
-                            cmd_name = "HOME"
-                        
-                        logger.info(f"  {cmd_name} {req_seq+1}/{len(full_mission)} uploaded (seq={req_seq})")
-                        time.sleep(0.05)  # Small delay between waypoint sends
+                    # The drone may already have queued more requests behind this one;
+                    # answer everything pending and push the frames out in as few writes as possible
+                    pending = [msg]
+                    while True:
+                        queued = self.master.recv_match(type=request_types, blocking=False)
+                        if queued is None:
+                            break
+                        pending.append(queued)
+                    timeout_count = 0  # Reset timeout counter on successful request
+                    count_resend_attempts = 0  # Reset count resend attempts
                     
-                    elif msg.get_type() == 'HEARTBEAT':
-                        # Heartbeat received - drone is alive but may not be ready for waypoints
-                        # Just continue waiting
-                        continue
+                    self.master.mav.file = batch
+                    try:
+                        for msg in pending:
+                            if msg.get_type() == 'MISSION_ACK':
+                                early_ack = msg
+                                break
+                            req_seq = msg.seq
+                            
+                            # Handle out-of-order requests by resending previous waypoints if needed.
+                            # A repeat that arrives within mission_item_timeout of our reply is the
+                            # drone's own retry crossing it on the link - skip it instead of flooding
+                            if req_seq < wp_index and req_seq in waypoints_sent:
+                                if time.time() - waypoints_sent[req_seq] < item_timeout:
+                                    logger.debug(f"  Ignoring duplicate request for seq={req_seq}")
+                                    continue
+                                resends += 1
+                                logger.info(f"  Re-sending waypoint {req_seq+1}/{len(full_mission)} (drone requested it again)")
+                            elif req_seq == wp_index:
+                                # Normal sequential request
+                                pass
+                            elif req_seq > wp_index:
+                                # Drone jumped ahead - expected only past items we pushed early
+                                if req_seq > next_to_send:
+                                    logger.warning(f"⚠️  Drone requested waypoint {req_seq} but we're at {wp_index}, jumping ahead")
+                                wp_index = req_seq
+                            else:
+                                # Out of sequence, skip
+                                continue
+                            
+                            send(req_seq)
+                            
+                            # Only advance wp_index if this is the next expected waypoint
+                            if req_seq == wp_index:
+                                wp_index += 1
+                            
+                            # With a window > 1, push the following items before they are requested.
+                            # A later request for one of them is answered again as a normal request.
+                            next_to_send = max(next_to_send, req_seq + 1)
+                            while next_to_send < min(req_seq + window, len(full_mission)):
+                                send(next_to_send)
+                                next_to_send += 1
+                
+                    finally:
+                        self.master.mav.file = self.master
+                        batch.flush()
+                
+                logger.info(f"📤 Sent {len(waypoints_sent)}/{len(full_mission)} items in "
+                            f"{time.monotonic() - upload_started:.1f}s ({resends} resends)")
                 
                 # Wait for mission ACK to confirm all waypoints received
                 logger.info(f"⏳ Waiting for mission ACK from Drone {self.drone_id}...")
                 ack_received = False
-                for attempt in range(5):  # Try up to 5 times
-                    msg = self.master.recv_match(type='MISSION_ACK', blocking=True, timeout=5)
-                    if msg and msg.type == mavutil.mavlink.MAV_MISSION_ACCEPTED:
+                deadline = time.monotonic() + 5 * self.mission_item_timeout
+                while not ack_received:
+                    remaining = deadline - time.monotonic()
+                    if early_ack is not None:
+                        msg, early_ack = early_ack, None
+                    else:
+                        msg = self._wait_msg('MISSION_ACK', remaining) if remaining > 0 else None
+                    if msg is None:
+                        logger.warning(f"⏱️  No MISSION_ACK within {5 * self.mission_item_timeout:.1f}s")
+                        break
+                    if msg.type == mavutil.mavlink.MAV_MISSION_ACCEPTED:
                         logger.info(f"✅ Mission ACK received - all {len(full_mission)} waypoints accepted")
                         ack_received = True
-                        break
-                    elif msg:
-                        logger.warning(f"⚠️  Unexpected MISSION_ACK type: {msg.type} (expected {mavutil.mavlink.MAV_MISSION_ACCEPTED})")
                     else:
-                        logger.warning(f"⏱️  Waiting for MISSION_ACK (attempt {attempt+1}/5)...")
-                        # Keep receiving other messages
-                        time.sleep(0.2)
+                        logger.warning(f"⚠️  Unexpected MISSION_ACK type: {msg.type} (expected {mavutil.mavlink.MAV_MISSION_ACCEPTED})")
                 
                 if ack_received:
                     logger.info(f"✅ Mission ACK received - all {len(full_mission)} waypoints accepted")
                     
-                    # CRITICAL: Wait for EEPROM write to complete on Pixhawk 2.4.8
-                    # The ACK is sent before EEPROM write finishes, causing verification to read old data
-                    logger.info(f"⏳ Waiting for EEPROM write to complete (Pixhawk 2.4.8 needs 4+ seconds)...")
-                    time.sleep(4.0)  # Increased from 2s to 4s - Pixhawk 2.4.8 EEPROM is VERY slow
-                    
-                    # Force mission protocol sync by requesting mission count
-                    # This helps ensure EEPROM write completed
+                    # The ACK can come before a slow EEPROM (Pixhawk 2.4.8) finishes writing.
+                    # Instead of a fixed 6s delay, sync on a count request: the autopilot
+                    # answers when it is free (allowed up to the old 4s delay + 3s timeout).
+                    # Item 1 is still read back below, polled until it reads as TAKEOFF (up to 13s).
                     logger.info(f"🔄 Forcing mission protocol sync (requesting mission count)...")
-                    self.master.mav.mission_request_list_send(
-                        self.master.target_system,
-                        self.master.target_component,
-                        mavutil.mavlink.MAV_MISSION_TYPE_MISSION
-                    )
-                    
-                    count_msg = self.master.recv_match(type='MISSION_COUNT', blocking=True, timeout=3.0)
+                    count_msg = self._request_mission_count(7.0)
                     if count_msg:
                         if count_msg.count == len(full_mission):
                             logger.info(f"✅ Mission count confirmed: {count_msg.count} waypoints in drone memory")
@@ -1382,78 +2054,91 @@ class DroneConnection:
                     else:
                         logger.warning(f"⚠️ Could not verify mission count after upload")
                     
-                    # Additional delay after count sync to let EEPROM finish writing waypoint data
-                    logger.info(f"⏳ Additional 2s delay for EEPROM waypoint data write...")
-                    time.sleep(2.0)  # Total now: 4s initial + 2s after count = 6 seconds total wait
-                    
                     # CRITICAL: DEBUG - Check what's actually at seq 0, 1, and 2
                     logger.info(f"🔍 DEBUG: Reading mission items to verify structure...")
                     
-                    for check_seq in [0, 1, 2]:
+                    # Request all three at once and collect the replies against one 3s deadline
+                    # (MISSION_REQUEST_LIST only returns the count, not the items)
+                    check_seqs = (0, 1, 2)
+                    for check_seq in check_seqs:
                         self.master.mav.mission_request_send(
-                            self.master.target_system,
-                            self.master.target_component,
+                            self.target_sys,
+                            self.target_comp,
                             check_seq
                         )
-                        msg = self.master.recv_match(type=['MISSION_ITEM_INT', 'MISSION_ITEM'], blocking=True, timeout=3.0)
+                    read_back = {}
+                    deadline = time.monotonic() + 3.0
+                    while len(read_back) < len(check_seqs):
+                        remaining = deadline - time.monotonic()
+                        msg = self._wait_msg(['MISSION_ITEM_INT', 'MISSION_ITEM'], remaining) if remaining > 0 else None
+                        if msg is None:
+                            break
+                        if msg.seq in check_seqs:
+                            read_back[msg.seq] = msg
+                    
+                    for check_seq in check_seqs:
+                        msg = read_back.get(check_seq)
                         if msg:
-                            cmd_name = {
-                                22: "TAKEOFF",
-                                16: "WAYPOINT/HOME", 
-                                20: "RTL",
-                                84: "NAV_VTOL_TAKEOFF"
-                            }.get(msg.command, f"UNKNOWN({msg.command})")
+                            cmd_name = MISSION_COMMAND_NAMES.get(msg.command, f"UNKNOWN({msg.command})")
                             if check_seq == 0:
                                 cmd_name = "HOME(NAV_WAYPOINT)"
                             logger.info(f"   seq {check_seq}: command={cmd_name} (ID={msg.command}), alt={msg.z:.1f}m")
                         else:
                             logger.warning(f"   seq {check_seq}: NO RESPONSE")
-                        time.sleep(0.1)
                     
                     # Now verify TAKEOFF at seq 1 (Mission Planner format: seq 0=HOME, seq 1=TAKEOFF)
                     logger.info(f"🔍 Verifying mission item 1 (TAKEOFF) before resuming telemetry...")
                     verification_success = False
                     
-                    for verify_attempt in range(3):
-                        # Wait 2 seconds between retry attempts to give EEPROM more time
-                        if verify_attempt > 0:
-                            logger.info(f"⏳ Waiting 2s before retry {verify_attempt+1}/3 (giving EEPROM more time)...")
-                            time.sleep(2.0)
-                        
+                    # Poll item 1 until it reads back as TAKEOFF instead of retrying on fixed
+                    # 2s waits: most boards pass on the first read, while a slow EEPROM still
+                    # gets the old worst case (3 reads of 3s plus two 2s waits) to catch up
+                    deadline = time.monotonic() + 13.0
+                    reads = 0
+                    item = None  # Last reply for seq 1
+                    while True:
                         self.master.mav.mission_request_send(
-                            self.master.target_system,
-                            self.master.target_component,
+                            self.target_sys,
+                            self.target_comp,
                             1  # Request mission item 1 (TAKEOFF in Mission Planner format)
                         )
+                        reads += 1
+                        read_deadline = min(deadline, time.monotonic() + self.mission_item_timeout)
+                        reply = None
+                        while reply is None:
+                            remaining = read_deadline - time.monotonic()
+                            msg = self._wait_msg(['MISSION_ITEM_INT', 'MISSION_ITEM'], remaining) if remaining > 0 else None
+                            if msg is None:
+                                break
+                            # Skip late seq 0/2 replies left over from the read-back above
+                            if msg.seq == 1:
+                                reply = item = msg
                         
-                        timeout = 3.0  # Fixed 3s timeout for response
-                        msg = self.master.recv_match(type=['MISSION_ITEM_INT', 'MISSION_ITEM'], blocking=True, timeout=timeout)
+                        if reply and reply.command == mavutil.mavlink.MAV_CMD_NAV_TAKEOFF:
+                            logger.info(f"✅ Mission item 1 verified: TAKEOFF (ID={reply.command}) at alt={reply.z}m")
+                            logger.info(f"   Verification succeeded on read {reads}")
+                            logger.info(f"   Mission structure: seq 0=HOME, seq 1=TAKEOFF, seq 2+=waypoints")
+                            verification_success = True
+                            break
+                        if reply:
+                            # Wrong command - old data still in EEPROM
+                            logger.debug(f"   Mission item 1 read {reads} is command ID={reply.command}, EEPROM still writing?")
                         
-                        if msg:
-                            # Check if it's the TAKEOFF command
-                            if msg.command == mavutil.mavlink.MAV_CMD_NAV_TAKEOFF:
-                                logger.info(f"✅ Mission item 1 verified: TAKEOFF (ID={msg.command}) at alt={msg.z}m")
-                                logger.info(f"   Verification succeeded on attempt {verify_attempt+1}/3")
-                                logger.info(f"   Mission structure: seq 0=HOME, seq 1=TAKEOFF, seq 2+=waypoints")
-                                verification_success = True
-                                break
-                            else:
-                                # Wrong command - old data still in EEPROM
-                                logger.warning(f"⚠️ Mission item 1 is NOT TAKEOFF on attempt {verify_attempt+1}/3")
-                                logger.warning(f"   Got command ID={msg.command}, expected {mavutil.mavlink.MAV_CMD_NAV_TAKEOFF}")
-                                logger.warning(f"   EEPROM still writing or corrupted...")
-                                
-                                if verify_attempt == 2:  # Last attempt failed
-                                    logger.error(f"❌ Mission item 1 (TAKEOFF) verification FAILED after 3 attempts!")
-                                    logger.error(f"   Final read: command ID={msg.command} (expected 22=TAKEOFF)")
-                                    logger.error(f"   REQUIRED ACTION: POWER CYCLE drone NOW")
-                                    return False
-                        else:
-                            if verify_attempt < 2:
-                                logger.warning(f"⚠️ Mission item 1 verification timeout (attempt {verify_attempt+1}/3), retrying...")
+                        if time.monotonic() >= deadline:
+                            break
+                        if reply:
+                            # Answered with stale data: give the EEPROM a moment before asking again
+                            time.sleep(0.25)
+                    
+                    if not verification_success and item:
+                        # Item 1 answered, but never as TAKEOFF
+                        logger.error(f"❌ Mission item 1 (TAKEOFF) verification FAILED after {reads} reads!")
+                        logger.error(f"   Final read: command ID={item.command} (expected 22=TAKEOFF)")
+                        logger.error(f"   REQUIRED ACTION: POWER CYCLE drone NOW")
+                        return False
                     
                     if not verification_success:
-                        logger.error(f"❌ Could not verify mission item 1 (TAKEOFF) after 3 attempts")
+                        logger.error(f"❌ Could not verify mission item 1 (TAKEOFF) after {reads} reads")
                         logger.error(f"   This indicates mission may not be in drone memory")
                         logger.error(f"   Continuing anyway, but AUTO mode may fail with 'Missing Takeoff Cmd'")
                         # Don't return False - let it continue, user can decide
@@ -1480,28 +2165,66 @@ class DroneConnection:
             self.uploading_mission = False
             return False
     
+    def _send_mission_start(self):
+        """Send MAV_CMD_MISSION_START for the whole uploaded mission"""
+        self.master.mav.command_long_send(
+            self.target_sys,
+            self.target_comp,
+            mavutil.mavlink.MAV_CMD_MISSION_START,
+            0,  # confirmation
+            0,  # param1: first mission item (0 uses current)
+            0,  # param2: last mission item (0 = all)
+            0, 0, 0, 0, 0  # unused params
+        )
+    
     def start_mission(self):
-        """Start the uploaded mission in AUTO mode (or simulate)"""
+        """Start the uploaded mission in AUTO mode (or simulate)
+        
+        Progress is recorded in _mission_start_state so a start running as a
+        background job can be polled via /drone/<id>/mission/start/status.
+        """
+        self._cancel_setpoint()
+        self._mission_start_state = 'idle'
+        self._mission_start_result = None
+        result = self._start_mission_state_machine()
+        self._mission_start_state = 'confirmed' if result.get('success') else 'failed'
+        self._mission_start_result = result
+        return result
+    
+    def mission_start_in_progress(self):
+        """True while a start_mission call is between GUIDED and AUTO confirmation"""
+        return self._mission_start_state in ('guided', 'auto_set')
+    
+    def _start_mission_state_machine(self):
+        """GUIDED -> mission_set_current -> AUTO -> MISSION_START, verified on the link"""
         try:
             if not self.mission_waypoints:
                 logger.error(f"No mission uploaded for Drone {self.drone_id}")
                 return {'success': False, 'error': 'No mission uploaded. Upload waypoints first.'}
             
             # Check if armed
-            if not self.telemetry.get('armed', False):
+            if not self.telemetry.armed:
                 logger.warning(f"Drone {self.drone_id} not armed! Cannot start mission.")
                 return {'success': False, 'error': 'Drone not armed. ARM the drone before starting mission.'}
             
             if self.simulation:
                 logger.info(f" Simulating mission START for Drone {self.drone_id}")
                 with self.lock:
-                    self.telemetry['flight_mode'] = 'AUTO'
+                    self.telemetry.flight_mode = 'AUTO'
+                    # Resolve each waypoint's coordinate keys once instead of on every tick
+                    self._sim_targets = [
+                        (wp.get('latitude', wp.get('lat', 0)),
+                         wp.get('longitude', wp.get('lon', 0)),
+                         wp.get('altitude', wp.get('alt', 0)))
+                        for wp in self.mission_waypoints
+                    ]
                     self.mission_active = True
                     self.current_waypoint_index = 0
+                    self._publish_telemetry()
                 logger.info(f" Simulated mission started for Drone {self.drone_id} ({len(self.mission_waypoints)} waypoints)")
                 return {'success': True, 'message': f'Mission started (simulated) - {len(self.mission_waypoints)} waypoints'}
             
-            current_mode = self.telemetry.get('flight_mode', '').upper()
+            current_mode = self.telemetry.flight_mode.upper()
             logger.info(f"📋 Current mode: {current_mode}")
             
             # ========== PRE-AUTO MODE VALIDATION ==========
@@ -1509,9 +2232,9 @@ class DroneConnection:
             logger.info(f"🔍 Validating pre-AUTO mode conditions...")
             
             # 1. GPS Quality Check
-            gps_fix = self.telemetry.get('gps_fix_type', 0)
-            hdop = self.telemetry.get('hdop', 99.99)
-            satellites = self.telemetry.get('satellites_visible', 0)
+            gps_fix = self.telemetry.gps_fix_type
+            hdop = self.telemetry.hdop
+            satellites = self.telemetry.satellites_visible
             
             pre_auto_errors = []
             if gps_fix < 3:
@@ -1522,13 +2245,13 @@ class DroneConnection:
                 logger.warning(f"⚠️ Low satellite count ({satellites}), but continuing...")
             
             # 2. Battery Check
-            battery_voltage = self.telemetry.get('battery_voltage', 0)
+            battery_voltage = self.telemetry.battery_voltage
             if battery_voltage < 10.5:
                 pre_auto_errors.append(f"Battery too low ({battery_voltage:.1f}V) for mission")
             
             # 3. Position Check (Home should be set)
-            home_lat = self.telemetry.get('latitude', 0)
-            home_lon = self.telemetry.get('longitude', 0)
+            home_lat = self.telemetry.latitude
+            home_lon = self.telemetry.longitude
             if home_lat == 0 and home_lon == 0:
                 pre_auto_errors.append("Home position not set (GPS not locked when armed?)")
             
@@ -1548,7 +2271,8 @@ class DroneConnection:
                 if not guided_success:
                     logger.error(f"❌ Failed to transition to GUIDED mode for Drone {self.drone_id}")
                     return {'success': False, 'error': 'Failed to set GUIDED mode. Check drone status.'}
-                time.sleep(0.5)
+                # set_mode already waited for the HEARTBEAT confirming GUIDED
+            self._mission_start_state = 'guided'
             
             # Mission was already verified during upload (mission item 1 = TAKEOFF confirmed)
             logger.info(f"✅ Mission already verified during upload - proceeding to AUTO mode")
@@ -1557,91 +2281,100 @@ class DroneConnection:
             # Mission Planner format: seq 0=HOME, seq 1=TAKEOFF
             logger.info(f"📌 Setting mission to start at waypoint 1 (TAKEOFF, seq 0=HOME)...")
             self.master.mav.mission_set_current_send(
-                self.master.target_system,
-                self.master.target_component,
+                self.target_sys,
+                self.target_comp,
                 1  # Start from waypoint 1 (TAKEOFF in Mission Planner format)
             )
-            time.sleep(0.3)
-            
-            # Verify mission_set_current was accepted
-            msg = self.master.recv_match(type='MISSION_CURRENT', blocking=True, timeout=2.0)
-            if msg and msg.seq == 1:
-                logger.info(f"✅ Mission current waypoint confirmed at index 1 (TAKEOFF)")
-            else:
-                logger.warning(f"⚠️ Could not confirm current waypoint set to 1, drone may start from different waypoint")
-                if msg:
-                    logger.warning(f"   Drone reports current waypoint: {msg.seq} (expected 1=TAKEOFF)")
             
-            # Try to set AUTO mode
+            # Try to set AUTO mode (set_mode verifies the switch via HEARTBEAT)
             logger.info(f" Setting AUTO mode to start mission for Drone {self.drone_id}...")
+            # STATUSTEXT received from here on explains mode changes during activation
+            status_seen = time.time()
             success = self.set_mode('AUTO')
+            start_sent = False
+            # The telemetry loop delivers the MISSION_START ACK and MISSION_CURRENT;
+            # register for the ACK before either send below
+            ack_slot = self.expect_ack(mavutil.mavlink.MAV_CMD_MISSION_START)
+            self._mission_current_event.clear()
             
             if not success:
                 logger.warning(f"⚠️ set_mode('AUTO') returned False, attempting MAV_CMD_MISSION_START...")
-                # Fallback: Use MAV_CMD_MISSION_START command directly
-                self.master.mav.command_long_send(
-                    self.master.target_system,
-                    self.master.target_component,
-                    mavutil.mavlink.MAV_CMD_MISSION_START,
-                    0,  # confirmation
-                    0,  # param1: first mission item (0 uses current)
-                    0,  # param2: last mission item (0 = all)
-                    0, 0, 0, 0, 0  # unused params
-                )
+                # Fallback: MAV_CMD_MISSION_START switches to AUTO itself; its ACK is checked below
+                self._send_mission_start()
+                start_sent = True
+            self._mission_start_state = 'auto_set'
+            
+            # Verify from the state the telemetry loop keeps: AUTO mode via HEARTBEAT (RTL means
+            # the switch was rejected), the current item via MISSION_CURRENT, and the
+            # MAV_CMD_MISSION_START ACK. Exit as soon as all three have been seen.
+            # ArduCopter won't auto-execute TAKEOFF in AUTO mode without MISSION_START, so it
+            # is sent as soon as AUTO is confirmed.
+            logger.info(f" Verifying AUTO mode activation and mission execution...")
+            mode_confirmed = False
+            rtl_detected = False
+            mission_confirmed = False
+            ack_received = False
+            deadline = time.monotonic() + 3.0
+            # HEARTBEATs are matched on their custom_mode number, not the decoded name
+            auto_id = self._mode_map.get('AUTO')
+            rtl_id = self._mode_map.get('RTL')
+            watched_modes = {mode_id for mode_id in (auto_id, rtl_id) if mode_id is not None}
+            
+            while time.monotonic() < deadline:
+                for entry in self._statustext_list:
+                    if entry['timestamp'] > status_seen:
+                        status_seen = entry['timestamp']
+                        text = entry['text']
+                        logger.warning(f"🔴 STATUSTEXT during AUTO activation: [{entry['severity']}] {text}")
+                        if 'RTL' in text.upper():
+                            rtl_detected = True
+                            logger.error(f"❌❌❌ RTL TRIGGERED: {text}")
                 
-                # Wait for MAV_CMD_MISSION_START acknowledgment
-                ack_received = False
-                for i in range(5):
-                    msg = self.master.recv_match(type='COMMAND_ACK', timeout=0.5)
-                    if msg and msg.command == mavutil.mavlink.MAV_CMD_MISSION_START:
-                        if msg.result == mavutil.mavlink.MAV_RESULT_ACCEPTED:
-                            logger.info(f"✅ MAV_CMD_MISSION_START accepted")
-                            ack_received = True
-                            break
-                        else:
-                            logger.error(f"❌ MAV_CMD_MISSION_START rejected: result={msg.result}")
-                            return {'success': False, 'error': f'Mission start command rejected by autopilot (result={msg.result})'}
+                custom_mode = self._last_hb['custom_mode']
+                if custom_mode is not None and custom_mode == rtl_id:
+                    rtl_detected = True
+                    logger.error(f"❌❌❌ DRONE SWITCHED TO RTL (not AUTO)!")
+                    logger.error(f"   This means AUTO mode was rejected by ArduPilot safety checks")
+                    logger.error(f"   Check STATUSTEXT messages above for the reason")
+                if rtl_detected:
+                    break
                 
-                if not ack_received:
-                    logger.warning(f"⚠️ No ACK for MAV_CMD_MISSION_START, but continuing...")
+                if not mode_confirmed and custom_mode is not None and custom_mode == auto_id:
+                    mode_confirmed = True
+                    logger.info(f"✅ AUTO mode CONFIRMED via HEARTBEAT")
                 
-                time.sleep(0.5)
-            
-            # CRITICAL: Verify AUTO mode is actually set via HEARTBEAT (not telemetry)
-            logger.info(f" Verifying AUTO mode activation via HEARTBEAT...")
-            mode_confirmed = False
-            rtl_detected = False
-            
-            for i in range(10):  # Try 10 times over 2 seconds
-                # Check for STATUSTEXT messages that explain mode changes
-                statustext_msg = self.master.recv_match(type='STATUSTEXT', blocking=False, timeout=0.05)
-                if statustext_msg:
-                    text = statustext_msg.text.decode('utf-8') if isinstance(statustext_msg.text, bytes) else str(statustext_msg.text)
-                    severity = statustext_msg.severity;
-                    logger.warning(f"🔴 STATUSTEXT during AUTO activation: [{severity}] {text}")
-                    
-                    # Check if RTL was triggered
-                    if 'RTL' in text.upper():
-                        rtl_detected = True
-                        logger.error(f"❌❌❌ RTL TRIGGERED: {text}")
+                if mode_confirmed and not start_sent:
+                    logger.info(f"🚀 Sending MAV_CMD_MISSION_START to trigger takeoff...")
+                    self._send_mission_start()
+                    start_sent = True
                 
-                msg = self.master.recv_match(type='HEARTBEAT', timeout=0.2)
-                if msg:
-                    actual_mode = mavutil.mode_string_v10(msg)
-                    logger.info(f"  HEARTBEAT #{i+1}: mode = {actual_mode}")
-                    
-                    # Detect RTL mode
-                    if 'RTL' in actual_mode.upper():
-                        rtl_detected = True
-                        logger.error(f"❌❌❌ DRONE SWITCHED TO RTL (not AUTO)!")
-                        logger.error(f"   This means AUTO mode was rejected by ArduPilot safety checks")
-                        logger.error(f"   Check STATUSTEXT messages above for the reason")
-                        
-                    if 'AUTO' in actual_mode.upper():
-                        mode_confirmed = True
-                        logger.info(f"✅ AUTO mode CONFIRMED via HEARTBEAT")
-                        break
-                time.sleep(0.1)
+                if not mission_confirmed and self._mission_current_event.is_set():
+                    logger.info(f"✅ MISSION_CURRENT: Drone executing waypoint {self.current_waypoint_index}")
+                    if self.current_waypoint_index != 1:
+                        logger.warning(f"   Drone reports current waypoint: {self.current_waypoint_index} (expected 1=TAKEOFF)")
+                    mission_confirmed = True
+                
+                if not ack_received and ack_slot.event.is_set():
+                    ack_received = True
+                    result = self.wait_ack(mavutil.mavlink.MAV_CMD_MISSION_START, ack_slot, 0)
+                    if result == _MAV_ACCEPTED:
+                        logger.info(f"✅ MAV_CMD_MISSION_START accepted - mission execution triggered!")
+                    elif not success:
+                        # The fallback path has nothing else to rely on
+                        logger.error(f"❌ MAV_CMD_MISSION_START rejected: result={result}")
+                        return {'success': False, 'error': f'Mission start command rejected by autopilot (result={result})'}
+                    else:
+                        logger.warning(f"⚠️ MAV_CMD_MISSION_START rejected: {result}")
+                
+                if mode_confirmed and mission_confirmed and ack_received:
+                    break
+                
+                # Wake on the next AUTO/RTL HEARTBEAT, or every 0.1s for the ACK and MISSION_CURRENT
+                self._wait_heartbeat(lambda hb: hb['custom_mode'] in watched_modes, 0.1)
+            
+            if not ack_received:
+                # Drop the slot; an ACK that arrived after the last check still counts
+                ack_received = self.wait_ack(mavutil.mavlink.MAV_CMD_MISSION_START, ack_slot, 0) is not None
             
             if rtl_detected:
                 logger.error(f"❌ Drone entered RTL instead of AUTO mode!")
@@ -1654,60 +2387,22 @@ class DroneConnection:
                 return {'success': False, 'error': 'Drone entered RTL instead of AUTO. Check STATUSTEXT messages for reason.'}
             
             if not mode_confirmed:
-                logger.error(f"❌ AUTO mode NOT confirmed via HEARTBEAT after 10 attempts")
+                logger.error(f"❌ AUTO mode NOT confirmed via HEARTBEAT")
                 logger.error(f"   Drone may still be in GUIDED or other mode")
                 logger.error(f"   Try: 1) Check GCS safety settings, 2) Ensure mission fully uploaded, 3) Manually switch to AUTO")
                 return {'success': False, 'error': 'Could not verify AUTO mode after multiple attempts. Drone may have rejected mode change.'}
             
-            # Verify mission is executing by checking MISSION_CURRENT
-            logger.info(f" Verifying mission execution...")
-            
-            mission_confirmed = False
-            for i in range(5):
-                msg = self.master.recv_match(type='MISSION_CURRENT', timeout=0.5)
-                if msg:
-                    current_wp = msg.seq
-                    logger.info(f"✅ MISSION_CURRENT: Drone executing waypoint {current_wp}")
-                    self.current_waypoint_index = current_wp
-                    mission_confirmed = True
-                    break
-                time.sleep(0.1)
-            
             if not mission_confirmed:
                 logger.warning(f"⚠️ Could not confirm MISSION_CURRENT")
-            
-            # CRITICAL FIX: Send MAV_CMD_MISSION_START to explicitly trigger mission execution
-            # ArduCopter won't auto-execute TAKEOFF in AUTO mode without this command
-            logger.info(f"🚀 Sending MAV_CMD_MISSION_START to trigger takeoff...")
-            self.master.mav.command_long_send(
-                self.master.target_system,
-                self.master.target_component,
-                mavutil.mavlink.MAV_CMD_MISSION_START,
-                0,  # confirmation
-                0,  # param1: first mission item (0 uses current)
-                0,  # param2: last mission item (0 = all)
-                0, 0, 0, 0, 0  # unused params
-            )
-            
-            # Wait for acknowledgment
-            ack = self.master.recv_match(type='COMMAND_ACK', blocking=True, timeout=2.0)
-            if ack and ack.command == mavutil.mavlink.MAV_CMD_MISSION_START:
-                if ack.result == mavutil.mavlink.MAV_RESULT_ACCEPTED:
-                    logger.info(f"✅ MAV_CMD_MISSION_START accepted - mission execution triggered!")
-                else:
-                    logger.warning(f"⚠️ MAV_CMD_MISSION_START rejected: {ack.result}")
-            else:
+            if not ack_received:
                 logger.warning(f"⚠️ No ACK for MAV_CMD_MISSION_START (mission may still execute)")
             
             # Mark mission as active only if AUTO mode confirmed
             self.mission_active = True
             logger.info(f"✅ Mission STARTED for Drone {self.drone_id} (waypoint {self.current_waypoint_index})")
             
-            # Give drone time to start executing
-            time.sleep(1.0)
-            
             # Check if drone is actually flying (altitude increasing)
-            initial_alt = self.telemetry.get('relative_altitude', 0)
+            initial_alt = self.telemetry.relative_altitude
             logger.info(f" Initial altitude: {initial_alt:.1f}m")
             
             return {'success': True, 'message': f'Mission started - {len(self.mission_waypoints)} waypoints', 'current_waypoint': self.current_waypoint_index}
@@ -1716,6 +2411,23 @@ class DroneConnection:
             logger.error(f"Failed to start mission for Drone {self.drone_id}: {e}")
             return {'success': False, 'error': f'Mission start exception: {str(e)}'}
     
+    def _send_pause_continue(self, resume):
+        """Send MAV_CMD_DO_PAUSE_CONTINUE (param1: 0=pause, 1=continue) and wait for its ACK
+        
+        Returns the COMMAND_ACK result, or None if no ACK arrived.
+        """
+        slot = self.expect_ack(mavutil.mavlink.MAV_CMD_DO_PAUSE_CONTINUE)
+        self.master.mav.command_long_send(
+            self.target_sys,
+            self.target_comp,
+            mavutil.mavlink.MAV_CMD_DO_PAUSE_CONTINUE,  # 193
+            0,  # confirmation
+            1 if resume else 0,  # param1
+            0, 0, 0, 0, 0, 0  # unused params
+        )
+        
+        return self.wait_ack(mavutil.mavlink.MAV_CMD_DO_PAUSE_CONTINUE, slot, 5 * self.ack_timeout)
+    
     def pause_mission(self):
         """Pause mission using MAV_CMD_DO_PAUSE_CONTINUE"""
         try:
@@ -1726,33 +2438,16 @@ class DroneConnection:
                 self.mission_active = False
                 return True
             
-            # Send MAV_CMD_DO_PAUSE_CONTINUE with param1=0 (pause)
-            self.master.mav.command_long_send(
-                self.master.target_system,
-                self.master.target_component,
-                mavutil.mavlink.MAV_CMD_DO_PAUSE_CONTINUE,  # 193
-                0,  # confirmation
-                0,  # param1: 0=pause
-                0, 0, 0, 0, 0, 0  # unused params
-            )
-            
-            # Wait for acknowledgment
-            ack_received = False
-            for i in range(5):
-                msg = self.master.recv_match(type='COMMAND_ACK', timeout=0.5)
-                if msg and msg.command == mavutil.mavlink.MAV_CMD_DO_PAUSE_CONTINUE:
-                    if msg.result == mavutil.mavlink.MAV_RESULT_ACCEPTED:
-                        logger.info(f"✅ Mission paused for Drone {self.drone_id}")
-                        self.mission_active = False
-                        ack_received = True
-                        return True
-                    else:
-                        logger.error(f"❌ Pause command rejected: result={msg.result}")
-                        return False
-            
-            if not ack_received:
+            result = self._send_pause_continue(resume=False)
+            if result is None:
                 logger.warning(f"⚠️ No ACK for pause command, but command was sent")
                 return True
+            if result == _MAV_ACCEPTED:
+                logger.info(f"✅ Mission paused for Drone {self.drone_id}")
+                self.mission_active = False
+                return True
+            logger.error(f"❌ Pause command rejected: result={result}")
+            return False
                 
         except Exception as e:
             logger.error(f"Failed to pause mission: {e}")
@@ -1768,34 +2463,17 @@ class DroneConnection:
                 self.mission_active = True
                 return True
             
-            # Send MAV_CMD_DO_PAUSE_CONTINUE with param1=1 (continue/resume)
-            self.master.mav.command_long_send(
-                self.master.target_system,
-                self.master.target_component,
-                mavutil.mavlink.MAV_CMD_DO_PAUSE_CONTINUE,  # 193
-                0,  # confirmation
-                1,  # param1: 1=continue/resume
-                0, 0, 0, 0, 0, 0  # unused params
-            )
-            
-            # Wait for acknowledgment
-            ack_received = False
-            for i in range(5):
-                msg = self.master.recv_match(type='COMMAND_ACK', timeout=0.5)
-                if msg and msg.command == mavutil.mavlink.MAV_CMD_DO_PAUSE_CONTINUE:
-                    if msg.result == mavutil.mavlink.MAV_RESULT_ACCEPTED:
-                        logger.info(f"✅ Mission resumed for Drone {self.drone_id}")
-                        self.mission_active = True
-                        ack_received = True
-                        return True
-                    else:
-                        logger.error(f"❌ Resume command rejected: result={msg.result}")
-                        return False
-            
-            if not ack_received:
+            result = self._send_pause_continue(resume=True)
+            if result is None:
                 logger.warning(f"⚠️ No ACK for resume command, but command was sent")
                 self.mission_active = True
                 return True
+            if result == _MAV_ACCEPTED:
+                logger.info(f"✅ Mission resumed for Drone {self.drone_id}")
+                self.mission_active = True
+                return True
+            logger.error(f"❌ Resume command rejected: result={result}")
+            return False
                 
         except Exception as e:
             logger.error(f"Failed to resume mission: {e}")
@@ -1819,6 +2497,7 @@ class DroneConnection:
                 self.master.waypoint_clear_all_send()
             
             self.mission_waypoints = []
+            self._sim_targets = []
             self.current_waypoint_index = 0
             logger.info(f" Mission stopped, drone returning to launch for Drone {self.drone_id}")
             return True
@@ -1829,26 +2508,19 @@ class DroneConnection:
     def get_mission_status(self):
         """Get current mission progress"""
         try:
-            # Request current mission item
-            self.master.mav.mission_request_int_send(
-                self.master.target_system,
-                self.master.target_component,
-                0  # Request current waypoint
-            )
-            
-            msg = self.master.recv_match(type='MISSION_CURRENT', blocking=True, timeout=1.0)
-            if msg:
-                self.current_waypoint_index = msg.seq
-                logger.info(f"MISSION_CURRENT: {msg.seq}, Total: {len(self.mission_waypoints)}")
+            # The telemetry loop keeps current_waypoint_index up to date from the streamed
+            # MISSION_CURRENT; only wait (briefly) if none has arrived yet
+            if not self.simulation and not self._mission_current_event.wait(1.0):
+                logger.debug(f"No MISSION_CURRENT from Drone {self.drone_id} yet")
             
             total = len(self.mission_waypoints)
             current = self.current_waypoint_index
             progress = (current / total * 100) if total > 0 else 0
             
             # Get current telemetry
-            current_alt = self.telemetry.get('relative_altitude', 0)
-            current_mode = self.telemetry.get('flight_mode', 'UNKNOWN')
-            is_armed = self.telemetry.get('armed', False)
+            current_alt = self.telemetry.relative_altitude
+            current_mode = self.telemetry.flight_mode
+            is_armed = self.telemetry.armed
             
             status = {
                 'active': self.mission_active,
@@ -1874,15 +2546,38 @@ class DroneConnection:
                 'error': str(e)
             }
     
+    def _publish_telemetry(self):
+        """Publish a snapshot of telemetry for lock-free readers (call with self.lock held)
+        
+        Readers get the snapshot via get_telemetry() without taking the lock. Rebinding
+        the attribute is atomic, so they see either the previous or the new dict, never
+        a half-updated one. Snapshots are shared and must not be modified.
+        """
+        snapshot = self.telemetry.to_dict()
+        snapshot['statustext_log'] = self._statustext_list
+        snapshot['mavlink_detections'] = self._detection_list
+        self._snapshot = snapshot
+    
     def get_telemetry(self):
-        """Get current telemetry data"""
-        with self.lock:
-            return self.telemetry.copy()
+        """Get current telemetry data (latest published snapshot, read-only)"""
+        return self._snapshot
+    
+    def status_summary(self):
+        """Mode, armed, GPS and battery state for command responses, from one snapshot"""
+        t = self._snapshot
+        return {
+            'current_mode': t['flight_mode'],
+            'armed': t['armed'],
+            'gps_status': GPS_FIX_NAMES.get(t['gps_fix_type'], 'UNKNOWN'),
+            'battery_voltage': t['battery_voltage']
+        }
     
     def disconnect(self):
         """Disconnect from drone"""
+        self._cancel_setpoint()
         self.running = False
         self.connected = False
+        connected_drones.discard(self.drone_id)
         if self.thread:
             self.thread.join(timeout=2.0)
         if self.master:
@@ -1892,17 +2587,104 @@ class DroneConnection:
 
 # ============== Flask API Routes ==============
 
+def _drone_lock(drone_id):
+    """Lock guarding replacement of drones[drone_id]"""
+    lock = drone_locks.get(drone_id)
+    if lock is None:
+        # setdefault is atomic, so racing requests end up with the same lock
+        lock = drone_locks.setdefault(drone_id, threading.Lock())
+    return lock
+
+
+def _get_connected(drone_id, **details):
+    """Look up a connected drone: (drone, None), or (None, 404 response) if it isn't connected"""
+    drone = drones.get(drone_id)
+    if drone is not None and drone.connected:
+        return drone, None
+    if not details:
+        return None, Response(_NOT_CONNECTED_BODY, status=404, mimetype='application/json')
+    return None, ojson({'error': 'Drone not connected', **details}, 404)
+
+
+def with_connected_drone(view):
+    """Route decorator: call view(drone, drone_id) for a connected drone, 404 otherwise"""
+    @functools.wraps(view)
+    def wrapper(drone_id):
+        drone, error = _get_connected(drone_id)
+        if error:
+            return error
+        return view(drone, drone_id)
+    return wrapper
+
+
+# Encoded {'success': ..., 'command': ...} bodies of the endpoints that only report success
+_COMMAND_BODIES = {
+    (command, success): _dumps({'success': success, 'command': command})
+    for command in ('land', 'rtl', 'mission_pause', 'mission_resume', 'mission_stop')
+    for success in (True, False)
+}
+
+
+def command_result(command, success):
+    """Response for a command endpoint that only reports success, from _COMMAND_BODIES"""
+    return Response(_COMMAND_BODIES[command, bool(success)], mimetype='application/json')
+
+
+def _json_body():
+    """Request body as a JSON object, or None if it is missing, not JSON or malformed
+    
+    Decoded with orjson when available. Bad input returns None instead of raising,
+    so handlers answer it with a plain 400.
+    """
+    if not request.is_json:
+        return None
+    raw = request.get_data(cache=False)
+    if not raw:
+        return None
+    try:
+        data = orjson.loads(raw) if orjson is not None else json.loads(raw)
+    except ValueError:  # orjson.JSONDecodeError is a ValueError too
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def _positive(value, cast):
+    """cast(value) if it is a positive number; raises ValueError/TypeError otherwise"""
+    number = cast(value)
+    if not number > 0:
+        raise ValueError(f"{value!r} is not positive")
+    return number
+
+
+def _not_connected(drone_id, command):
+    """404 for a command on a drone that isn't connected
+    
+    With ?diag=1 the body also lists the known and connected drones; otherwise
+    the prebuilt body is returned.
+    """
+    if not request.args.get('diag'):
+        return Response(_NOT_CONNECTED_BODY, status=404, mimetype='application/json')
+    return ojson({
+        'success': False,
+        'error': 'Drone not connected',
+        'command': command,
+        'drone_id': drone_id,
+        'available_drones': list(drones.keys()),
+        'connected_drones': list(connected_drones)
+    }, 404)
+
+
 @app.route('/health', methods=['GET'])
 def health():
     """Health check endpoint"""
-    return jsonify({'status': 'ok', 'service': 'pymavlink'})
+    return ojson({'status': 'ok', 'service': 'pymavlink'})
 
 
 @app.route('/drones', methods=['GET'])
 def get_drones():
     """Get list of all drones and their status"""
     drone_list = []
-    for drone_id, drone in drones.items():
+    for drone_id, drone in list(drones.items()):
         drone_list.append({
             'drone_id': drone_id,
             'connected': drone.connected,
@@ -1910,29 +2692,68 @@ def get_drones():
             'port': drone.port,
             'telemetry': drone.get_telemetry() if drone.connected else None
         })
-    return jsonify({'drones': drone_list})
+    return ojson({'drones': drone_list})
+
+
+@app.route('/drones/telemetry', methods=['GET'])
+def get_all_telemetry():
+    """Get telemetry for every connected drone in one response"""
+    telemetry = {
+        drone_id: drone.get_telemetry()
+        for drone_id, drone in list(drones.items())
+        if drone.connected
+    }
+    return ojson({
+        'drones': telemetry,
+        'count': len(telemetry),
+        'timestamp': time.time()
+    })
 
 
 @app.route('/drone/<int:drone_id>/connect', methods=['POST'])
 def connect_drone(drone_id):
     """Connect to a specific drone (or start simulation)"""
-    data = request.json or {}
+    data = _json_body() or {}
     port = data.get('port', f'/dev/ttyUSB{drone_id-1}')
-    baudrate = data.get('baudrate', 57600)
     simulation = data.get('simulation', False)  # Enable simulation mode
-    
-    if drone_id in drones:
-        if drones[drone_id].connected:
-            return jsonify({'error': 'Drone already connected'}), 400
-        drones[drone_id].disconnect()
-    
-    drone = DroneConnection(drone_id, port, baudrate, simulation=simulation)
-    success = drone.connect()
+    # JSON may carry these as strings or garbage; convert here so bad input is a 400
+    # rather than an error in the constructor or, for the timeouts, mid-upload
+    try:
+        baudrate = _positive(data.get('baudrate', 57600), int)
+        # Optional per-link tuning; defaults are derived from the port type and baudrate
+        mission_item_timeout = data.get('mission_item_timeout')
+        if mission_item_timeout is not None:
+            mission_item_timeout = _positive(mission_item_timeout, float)
+        ack_timeout = data.get('ack_timeout')
+        if ack_timeout is not None:
+            ack_timeout = _positive(ack_timeout, float)
+        mission_upload_window = data.get('mission_upload_window')
+        if mission_upload_window is None:
+            mission_upload_window = 1
+        elif mission_upload_window != 'all':
+            mission_upload_window = _positive(mission_upload_window, int)
+    except (TypeError, ValueError):
+        return ojson({'error': 'baudrate, mission_item_timeout, ack_timeout and mission_upload_window '
+                               'must be positive numbers (mission_upload_window may also be "all")'}, 400)
+    
+    # Held through connect() so a second request for the same drone can't open the port twice
+    with _drone_lock(drone_id):
+        existing = drones.get(drone_id)
+        if existing is not None:
+            if existing.connected:
+                return ojson({'error': 'Drone already connected'}, 400)
+            existing.disconnect()
+        
+        drone = DroneConnection(drone_id, port, baudrate, simulation=simulation,
+                                mission_item_timeout=mission_item_timeout, ack_timeout=ack_timeout,
+                                mission_upload_window=mission_upload_window)
+        success = drone.connect()
+        if success:
+            drones[drone_id] = drone
     
     if success:
-        drones[drone_id] = drone
         mode_label = "🎮 SIMULATION" if simulation else "REAL HARDWARE"
-        return jsonify({
+        return ojson({
             'success': True, 
             'drone_id': drone_id, 
             'connected': True,
@@ -1940,25 +2761,28 @@ def connect_drone(drone_id):
             'mode': mode_label
         })
     else:
-        return jsonify({'success': False, 'error': 'Failed to connect'}), 500
+        return ojson({'success': False, 'error': 'Failed to connect'}, 500)
 
 
 @app.route('/drone/<int:drone_id>/simulate', methods=['POST'])
 def start_simulation(drone_id):
     """Quick start simulation mode for testing without hardware"""
     try:
-        if drone_id in drones:
-            if drones[drone_id].connected:
-                return jsonify({'error': 'Drone already connected. Disconnect first.'}), 400
-            drones[drone_id].disconnect()
-        
-        logger.info(f"🎮 Starting simulation mode for Drone {drone_id}")
-        drone = DroneConnection(drone_id, port='simulation', baudrate=57600, simulation=True)
-        success = drone.connect()
+        with _drone_lock(drone_id):
+            existing = drones.get(drone_id)
+            if existing is not None:
+                if existing.connected:
+                    return ojson({'error': 'Drone already connected. Disconnect first.'}, 400)
+                existing.disconnect()
+            
+            logger.info(f"🎮 Starting simulation mode for Drone {drone_id}")
+            drone = DroneConnection(drone_id, port='simulation', baudrate=57600, simulation=True)
+            success = drone.connect()
+            if success:
+                drones[drone_id] = drone
         
         if success:
-            drones[drone_id] = drone
-            return jsonify({
+            return ojson({
                 'success': True,
                 'drone_id': drone_id,
                 'mode': 'simulation',
@@ -1966,37 +2790,40 @@ def start_simulation(drone_id):
                 'telemetry': drone.get_telemetry()
             })
         else:
-            return jsonify({'success': False, 'error': 'Simulation failed to start'}), 500
+            return ojson({'success': False, 'error': 'Simulation failed to start'}, 500)
             
     except Exception as e:
         logger.error(f"Simulation start error: {e}")
-        return jsonify({'success': False, 'error': str(e)}), 500
+        return ojson({'success': False, 'error': str(e)}, 500)
 
 
 @app.route('/drone/<int:drone_id>/disconnect', methods=['POST'])
 def disconnect_drone(drone_id):
     """Disconnect from a specific drone"""
-    if drone_id not in drones:
-        return jsonify({'error': 'Drone not found'}), 404
-    
-    drones[drone_id].disconnect()
-    return jsonify({'success': True, 'drone_id': drone_id, 'connected': False})
+    with _drone_lock(drone_id):
+        drone = drones.get(drone_id)
+        if drone is None:
+            return ojson({'error': 'Drone not found'}, 404)
+        
+        drone.disconnect()
+    return ojson({'success': True, 'drone_id': drone_id, 'connected': False})
 
 
 @app.route('/drone/<int:drone_id>/telemetry', methods=['GET'])
 def get_telemetry(drone_id):
     """Get telemetry for a specific drone"""
-    if drone_id not in drones:
-        return jsonify({'error': 'Drone not found'}), 404
+    drone = drones.get(drone_id)
+    if drone is None:
+        return ojson({'error': 'Drone not found'}, 404)
     
-    if not drones[drone_id].connected:
-        return jsonify({'error': 'Drone not connected'}), 400
+    if not drone.connected:
+        return ojson({'error': 'Drone not connected'}, 400)
     
-    telemetry = drones[drone_id].get_telemetry()
+    telemetry = drone.get_telemetry()
     
     # Add debug info
     debug_info = {
-        'simulation_mode': drones[drone_id].simulation,
+        'simulation_mode': drone.simulation,
         'has_gps_data': telemetry.get('satellites_visible', 0) > 0,
         'has_battery_data': telemetry.get('battery_voltage', 0) > 0,
         'has_position_data': telemetry.get('latitude', 0) != 0 or telemetry.get('longitude', 0) != 0,
@@ -2004,9 +2831,9 @@ def get_telemetry(drone_id):
         'data_age_seconds': time.time() - telemetry.get('timestamp', time.time())
     }
     
-    return jsonify({
+    return ojson({
         'drone_id': drone_id,
-        'simulation': drones[drone_id].simulation,
+        'simulation': drone.simulation,
         'telemetry': telemetry,
         'timestamp': telemetry.get('timestamp', time.time()),
         'debug': debug_info
@@ -2016,19 +2843,20 @@ def get_telemetry(drone_id):
 @app.route('/drone/<int:drone_id>/debug', methods=['GET'])
 def debug_telemetry(drone_id):
     """Debug endpoint to see raw telemetry data"""
-    if drone_id not in drones:
-        return jsonify({'error': 'Drone not found'}), 404
+    drone = drones.get(drone_id)
+    if drone is None:
+        return ojson({'error': 'Drone not found'}, 404)
     
-    if not drones[drone_id].connected:
-        return jsonify({'error': 'Drone not connected'}), 400
+    if not drone.connected:
+        return ojson({'error': 'Drone not connected'}, 400)
     
-    telemetry = drones[drone_id].get_telemetry()
+    telemetry = drone.get_telemetry()
     
     # Return formatted for easy reading
-    return jsonify({
+    return ojson({
         'drone_id': drone_id,
-        'connected': drones[drone_id].connected,
-        'running': drones[drone_id].running,
+        'connected': drone.connected,
+        'running': drone.running,
         'telemetry_fields': list(telemetry.keys()),
         'telemetry_values': telemetry,
         'non_zero_fields': {k: v for k, v in telemetry.items() if v not in [0, 0.0, False, 'UNKNOWN', '']}
@@ -2038,160 +2866,154 @@ def debug_telemetry(drone_id):
 @app.route('/drone/<int:drone_id>/arm', methods=['POST'])
 def arm_drone(drone_id):
     """Arm a drone"""
-    if drone_id not in drones or not drones[drone_id].connected:
-        return jsonify({
-            'success': False, 
-            'error': 'Drone not connected',
-            'command': 'arm',
-            'drone_id': drone_id,
-            'available_drones': list(drones.keys()),
-            'connected_drones': [d_id for d_id in drones.keys() if drones[d_id].connected]
-        }), 404
+    drone = drones.get(drone_id)
+    if drone is None or not drone.connected:
+        return _not_connected(drone_id, 'arm')
     
     try:
-        result = drones[drone_id].arm()
+        result = drone.arm()
         if result['success']:
-            return jsonify({
+            return ojson({
                 'success': True, 
                 'command': 'arm', 
                 'message': result.get('message', 'Armed'),
                 'armed': True,
-                'current_mode': drones[drone_id].telemetry.get('flight_mode', 'UNKNOWN')
+                'current_mode': drone.telemetry.flight_mode
             })
         else:
-            drone_telem = drones[drone_id].telemetry
-            return jsonify({
+            return ojson({
                 'success': False, 
                 'command': 'arm', 
                 'error': result.get('error', 'ARM failed'),
                 'details': result.get('details', ''),
-                'current_mode': drone_telem.get('flight_mode', 'UNKNOWN'),
-                'armed': drone_telem.get('armed', False),
-                'gps_status': drone_telem.get('gps_status', 'UNKNOWN'),
-                'battery_voltage': drone_telem.get('battery_voltage', 0),
+                **drone.status_summary(),
                 'diagnostics': result.get('diagnostics', {})
-            }), 400
+            }, 400)
     except Exception as e:
         logger.error(f"ARM endpoint exception: {e}")
-        drone_telem = drones[drone_id].telemetry if drone_id in drones else {}
-        return jsonify({
+        return ojson({
             'success': False,
             'command': 'arm',
             'error': f'ARM exception: {str(e)}',
-            'current_mode': drone_telem.get('flight_mode', 'UNKNOWN'),
-            'armed': drone_telem.get('armed', False)
-        }), 500
+            **drone.status_summary()
+        }, 500)
 
 
 @app.route('/drone/<int:drone_id>/disarm', methods=['POST'])
-def disarm_drone(drone_id):
+@with_connected_drone
+def disarm_drone(drone, drone_id):
     """Disarm a drone"""
-    if drone_id not in drones or not drones[drone_id].connected:
-        return jsonify({'success': False, 'error': 'Drone not connected', 'command': 'disarm'}), 404
-    
-    result = drones[drone_id].disarm()
+    result = drone.disarm()
     if result['success']:
-        return jsonify({'success': True, 'command': 'disarm', 'message': result.get('message', 'Disarmed')})
+        return ojson({'success': True, 'command': 'disarm', 'message': result.get('message', 'Disarmed')})
     else:
-        return jsonify({'success': False, 'command': 'disarm', 'error': result.get('error', 'Disarm failed')}), 400
+        return ojson({'success': False, 'command': 'disarm', 'error': result.get('error', 'Disarm failed')}, 400)
 
 
 @app.route('/drone/<int:drone_id>/mode', methods=['POST'])
 def set_mode(drone_id):
     """Set flight mode"""
-    if drone_id not in drones or not drones[drone_id].connected:
-        return jsonify({'error': 'Drone not connected'}), 404
+    drone, error = _get_connected(drone_id)
+    if error:
+        return error
     
-    data = request.json
+    data = _json_body()
+    if data is None:
+        return ojson({'error': 'JSON body required'}, 400)
     mode = data.get('mode')
     
     if not mode:
-        return jsonify({'error': 'Mode not specified'}), 400
+        return ojson({'error': 'Mode not specified'}, 400)
     
-    success = drones[drone_id].set_mode(mode)
-    return jsonify({'success': success, 'command': 'set_mode', 'mode': mode})
+    success = drone.set_mode(mode)
+    return ojson({'success': success, 'command': 'set_mode', 'mode': mode})
 
 
 @app.route('/drone/<int:drone_id>/takeoff', methods=['POST'])
 def takeoff(drone_id):
     """Takeoff to specified altitude"""
-    if drone_id not in drones or not drones[drone_id].connected:
-        return jsonify({'error': 'Drone not connected'}), 404
+    drone, error = _get_connected(drone_id)
+    if error:
+        return error
     
-    data = request.json
+    data = _json_body()
+    if data is None:
+        return ojson({'error': 'JSON body required'}, 400)
     altitude = data.get('altitude', 10)
     
-    success = drones[drone_id].takeoff(altitude)
-    return jsonify({'success': success, 'command': 'takeoff', 'altitude': altitude})
+    success = drone.takeoff(altitude)
+    return ojson({'success': success, 'command': 'takeoff', 'altitude': altitude})
 
 
 @app.route('/drone/<int:drone_id>/land', methods=['POST'])
-def land(drone_id):
+@with_connected_drone
+def land(drone, drone_id):
     """Land the drone"""
-    if drone_id not in drones or not drones[drone_id].connected:
-        return jsonify({'error': 'Drone not connected'}), 404
-    
-    success = drones[drone_id].land()
-    return jsonify({'success': success, 'command': 'land'})
+    success = drone.land()
+    return command_result('land', success)
 
 
 @app.route('/drone/<int:drone_id>/rtl', methods=['POST'])
-def rtl(drone_id):
+@with_connected_drone
+def rtl(drone, drone_id):
     """Return to launch"""
-    if drone_id not in drones or not drones[drone_id].connected:
-        return jsonify({'error': 'Drone not connected'}), 404
-    
-    success = drones[drone_id].rtl()
-    return jsonify({'success': success, 'command': 'rtl'})
+    success = drone.rtl()
+    return command_result('rtl', success)
 
 
 @app.route('/drone/<int:drone_id>/goto', methods=['POST'])
 def goto(drone_id):
     """Go to specific location"""
-    if drone_id not in drones or not drones[drone_id].connected:
-        return jsonify({'error': 'Drone not connected'}), 404
+    drone, error = _get_connected(drone_id)
+    if error:
+        return error
     
-    data = request.json
+    data = _json_body()
+    if data is None:
+        return ojson({'error': 'JSON body required'}, 400)
     latitude = data.get('latitude')
     longitude = data.get('longitude')
     altitude = data.get('altitude', 10)
     
     if latitude is None or longitude is None:
-        return jsonify({'error': 'Latitude and longitude required'}), 400
+        return ojson({'error': 'Latitude and longitude required'}, 400)
     
-    success = drones[drone_id].goto(latitude, longitude, altitude)
-    return jsonify({'success': success, 'command': 'goto'})
+    success = drone.goto(latitude, longitude, altitude)
+    return ojson({'success': success, 'command': 'goto'})
 
 
 @app.route('/drone/<int:drone_id>/mission/upload', methods=['POST'])
 def upload_mission(drone_id):
     """Upload mission waypoints to drone"""
-    if drone_id not in drones or not drones[drone_id].connected:
-        return jsonify({
-            'success': False,
-            'error': 'Drone not connected', 
-            'command': 'mission_upload',
-            'drone_id': drone_id,
-            'available_drones': list(drones.keys()),
-            'connected_drones': [d_id for d_id in drones.keys() if drones[d_id].connected]
-        }), 404
+    drone = drones.get(drone_id)
+    if drone is None or not drone.connected:
+        return _not_connected(drone_id, 'mission_upload')
+    
+    if (request.content_length or 0) > MAX_MISSION_BYTES:
+        return ojson({'success': False, 'error': 'Payload too large', 'command': 'mission_upload'}, 413)
     
-    data = request.json
+    data = _json_body()
+    if data is None:
+        return ojson({'error': 'JSON body required'}, 400)
     waypoints = data.get('waypoints', [])
     
     if not waypoints:
-        return jsonify({
+        return ojson({
             'success': False,
             'error': 'No waypoints provided',
             'command': 'mission_upload'
-        }), 400
+        }, 400)
+    
+    if data.get('async'):
+        return job_accepted(submit_job(drone_id, 'mission_upload',
+                                       drone.upload_mission_waypoints, waypoints))
     
     try:
-        success = drones[drone_id].upload_mission_waypoints(waypoints)
-        drone_telem = drones[drone_id].telemetry
+        success = drone.upload_mission_waypoints(waypoints)
+        drone_telem = drone.get_telemetry()
         
         if success:
-            return jsonify({
+            return ojson({
                 'success': True,
                 'command': 'mission_upload',
                 'drone_id': drone_id,
@@ -2199,37 +3021,43 @@ def upload_mission(drone_id):
                 'telemetry': drone_telem
             })
         else:
-            return jsonify({'success': False, 'error': 'Mission upload failed', 'telemetry': drone_telem}), 500
+            return ojson({'success': False, 'error': 'Mission upload failed', 'telemetry': drone_telem}, 500)
     except Exception as e:
         logger.error(f"Mission upload exception: {e}")
-        return jsonify({'success': False, 'error': str(e)}), 500
+        return ojson({'success': False, 'error': str(e)}, 500)
 
 
 @app.route('/drone/<int:drone_id>/mission/upload_waypoints_file', methods=['POST'])
 def upload_waypoints_file(drone_id):
     """Upload mission from Mission Planner .waypoints file"""
-    if drone_id not in drones or not drones[drone_id].connected:
-        return jsonify({
+    drone = drones.get(drone_id)
+    if drone is None or not drone.connected:
+        return ojson({
             'success': False,
             'error': 'Drone not connected',
             'drone_id': drone_id
-        }), 404
+        }, 404)
     
-    data = request.json
+    if (request.content_length or 0) > MAX_MISSION_BYTES:
+        return ojson({'success': False, 'error': 'Payload too large'}, 413)
+    
+    data = _json_body()
+    if data is None:
+        return ojson({'error': 'JSON body required'}, 400)
     waypoints_content = data.get('waypoints_file_content', '')
     
     if not waypoints_content:
-        return jsonify({
+        return ojson({
             'success': False,
             'error': 'No .waypoints file content provided'
-        }), 400
+        }, 400)
     
     try:
-        success = drones[drone_id].upload_waypoints_file(waypoints_content)
-        drone_telem = drones[drone_id].telemetry
+        success = drone.upload_waypoints_file(waypoints_content)
+        drone_telem = drone.get_telemetry()
         
         if success:
-            return jsonify({
+            return ojson({
                 'success': True,
                 'command': 'upload_waypoints_file',
                 'drone_id': drone_id,
@@ -2237,108 +3065,134 @@ def upload_waypoints_file(drone_id):
                 'telemetry': drone_telem
             })
         else:
-            return jsonify({
+            return ojson({
                 'success': False,
                 'error': 'Waypoints file upload failed',
                 'telemetry': drone_telem
-            }), 500
+            }, 500)
     except Exception as e:
         logger.error(f"Waypoints file upload exception: {e}")
-        return jsonify({'success': False, 'error': str(e)}), 500
+        return ojson({'success': False, 'error': str(e)}, 500)
 
 
 @app.route('/drone/<int:drone_id>/mission/start', methods=['POST'])
 def start_mission(drone_id):
     """Start the uploaded mission"""
-    if drone_id not in drones or not drones[drone_id].connected:
-        return jsonify({
-            'success': False, 
-            'error': 'Drone not connected',
-            'command': 'mission_start',
-            'drone_id': drone_id,
-            'available_drones': list(drones.keys()),
-            'connected_drones': [d_id for d_id in drones.keys() if drones[d_id].connected]
-        }), 404
+    drone = drones.get(drone_id)
+    if drone is None or not drone.connected:
+        return _not_connected(drone_id, 'mission_start')
+    
+    data = _json_body() or {}
+    if data.get('async'):
+        if drone.mission_start_in_progress():
+            return ojson({
+                'success': False,
+                'command': 'mission_start',
+                'error': 'Mission start already in progress',
+                'state': drone._mission_start_state
+            }, 409)
+        job = submit_job(drone_id, 'mission_start', drone.start_mission)
+        return job_accepted(job, state=drone._mission_start_state)
     
     try:
-        result = drones[drone_id].start_mission()
+        result = drone.start_mission()
         if result['success']:
-            drone_telem = drones[drone_id].telemetry
-            return jsonify({
+            return ojson({
                 'success': True, 
                 'command': 'mission_start', 
                 'message': result.get('message', 'Mission started'),
-                'current_mode': drone_telem.get('flight_mode', 'AUTO'),
-                'armed': drone_telem.get('armed', True)
+                **drone.status_summary()
             })
         else:
-            drone_telem = drones[drone_id].telemetry
-            return jsonify({
+            return ojson({
                 'success': False, 
                 'command': 'mission_start', 
                 'error': result.get('error', 'Mission start failed'),
                 'details': result.get('details', ''),
-                'current_mode': drone_telem.get('flight_mode', 'UNKNOWN'),
-                'armed': drone_telem.get('armed', False),
-                'gps_status': drone_telem.get('gps_status', 'UNKNOWN'),
-                'battery_voltage': drone_telem.get('battery_voltage', 0),
+                **drone.status_summary(),
                 'diagnostics': result.get('diagnostics', {})
-            }), 400
+            }, 400)
     except Exception as e:
         logger.error(f"Mission start endpoint exception: {e}")
-        drone_telem = drones[drone_id].telemetry if drone_id in drones else {}
-        return jsonify({
+        return ojson({
             'success': False,
             'command': 'mission_start',
             'error': f'Mission start exception: {str(e)}',
-            'current_mode': drone_telem.get('flight_mode', 'UNKNOWN'),
-            'armed': drone_telem.get('armed', False)
-        }), 500
+            **drone.status_summary()
+        }, 500)
 
 
 @app.route('/drone/<int:drone_id>/mission/pause', methods=['POST'])
-def pause_mission(drone_id):
+@with_connected_drone
+def pause_mission(drone, drone_id):
     """Pause the current mission"""
-    if drone_id not in drones or not drones[drone_id].connected:
-        return jsonify({'error': 'Drone not connected'}), 404
+    data = _json_body() or {}
+    if data.get('async'):
+        return job_accepted(submit_job(drone_id, 'mission_pause', drone.pause_mission))
     
-    success = drones[drone_id].pause_mission()
-    return jsonify({'success': success, 'command': 'mission_pause'})
+    success = drone.pause_mission()
+    return command_result('mission_pause', success)
 
 
 @app.route('/drone/<int:drone_id>/mission/resume', methods=['POST'])
-def resume_mission(drone_id):
+@with_connected_drone
+def resume_mission(drone, drone_id):
     """Resume the paused mission"""
-    if drone_id not in drones or not drones[drone_id].connected:
-        return jsonify({'error': 'Drone not connected'}), 404
+    data = _json_body() or {}
+    if data.get('async'):
+        return job_accepted(submit_job(drone_id, 'mission_resume', drone.resume_mission))
     
-    success = drones[drone_id].resume_mission()
-    return jsonify({'success': success, 'command': 'mission_resume'})
+    success = drone.resume_mission()
+    return command_result('mission_resume', success)
 
 
 @app.route('/drone/<int:drone_id>/mission/stop', methods=['POST'])
-def stop_mission(drone_id):
+@with_connected_drone
+def stop_mission(drone, drone_id):
     """Stop and clear the mission"""
-    if drone_id not in drones or not drones[drone_id].connected:
-        return jsonify({'error': 'Drone not connected'}), 404
-    
-    success = drones[drone_id].stop_mission()
-    return jsonify({'success': success, 'command': 'mission_stop'})
+    success = drone.stop_mission()
+    return command_result('mission_stop', success)
 
 
 @app.route('/drone/<int:drone_id>/mission/status', methods=['GET'])
-def mission_status(drone_id):
+@with_connected_drone
+def mission_status(drone, drone_id):
     """Get current mission status and progress"""
-    if drone_id not in drones or not drones[drone_id].connected:
-        return jsonify({'error': 'Drone not connected'}), 404
-    
-    status = drones[drone_id].get_mission_status()
-    return jsonify({
+    status = drone.get_mission_status()
+    return ojson({
         'drone_id': drone_id,
         'mission_status': status
     })
 
 
+@app.route('/drone/<int:drone_id>/job/<int:job_id>', methods=['GET'])
+def job_status(drone_id, job_id):
+    """Poll a mission command started with {"async": true}"""
+    with jobs_lock:
+        job = jobs.get(job_id)
+        job = dict(job) if job and job['drone_id'] == drone_id else None
+    
+    if job is None:
+        return ojson({'success': False, 'error': 'Job not found', 'job_id': job_id}, 404)
+    return ojson(job)
+
+
+@app.route('/drone/<int:drone_id>/mission/start/status', methods=['GET'])
+def mission_start_status(drone_id):
+    """Progress of the last mission start (idle, guided, auto_set, confirmed, failed)"""
+    drone = drones.get(drone_id)
+    if drone is None:
+        return ojson({'success': False, 'error': 'Drone not found'}, 404)
+    
+    return ojson({
+        'success': True,
+        'drone_id': drone_id,
+        'state': drone._mission_start_state,
+        'in_progress': drone.mission_start_in_progress(),
+        'result': drone._mission_start_result
+    })
+
+
 # ========================================
 #    Long-Range Pi Control via MAVLink   |
 # ========================================
@@ -2346,33 +3200,29 @@ def mission_status(drone_id):
 @app.route('/drone/<int:drone_id>/pi/start_detection', methods=['POST'])
 def pi_start_detection(drone_id):
     """Send MAVLink command to Pi to start detection (long-range control)"""
-    if drone_id not in drones or not drones[drone_id].connected:
-        return jsonify({'error': 'Drone not connected'}), 404
+    drone, error = _get_connected(drone_id)
+    if error:
+        return error
     
     try:
+        slot = drone.expect_ack(PI_CMD_START_DETECTION)
         # Send custom MAVLink command 42000 = Start Detection
-        drones[drone_id].master.mav.command_long_send(
-            drones[drone_id].master.target_system,
-            drones[drone_id].master.target_component,
-            42000,  # Custom command ID for start detection
-            0,      # confirmation
-            0, 0, 0, 0, 0, 0, 0  # params
-        )
+        drone.command_long(PI_CMD_START_DETECTION)
         
-        logger.info(f"📡 Sent MAVLink command: Start Detection to Drone {drone_id}")
+        logger.info("📡 Sent MAVLink command: %s to Drone %d", "Start Detection", drone_id)
         
-        # Wait for ACK
-        ack = drones[drone_id].master.recv_match(type='COMMAND_ACK', blocking=True, timeout=3.0)
-        if ack and ack.command == 42000:
-            success = ack.result == mavutil.mavlink.MAV_RESULT_ACCEPTED
-            return jsonify({
+        # Wait for the ACK (delivered by the telemetry loop)
+        ack_result = drone.wait_ack(PI_CMD_START_DETECTION, slot, 3.0)
+        if ack_result is not None:
+            success = ack_result == _MAV_ACCEPTED
+            return ojson({
                 'success': success,
                 'command': 'start_detection',
                 'drone_id': drone_id,
-                'ack_result': ack.result
+                'ack_result': ack_result
             })
         else:
-            return jsonify({
+            return ojson({
                 'success': False,
                 'command': 'start_detection',
                 'drone_id': drone_id,
@@ -2380,40 +3230,36 @@ def pi_start_detection(drone_id):
             })
             
     except Exception as e:
-        logger.error(f"Failed to send start detection command: {e}")
-        return jsonify({'error': str(e)}), 500
+        logger.error("Failed to send start detection command: %s", e)
+        return ojson({'error': str(e)}, 500)
 
 
 @app.route('/drone/<int:drone_id>/pi/stop_detection', methods=['POST'])
 def pi_stop_detection(drone_id):
     """Send MAVLink command to Pi to stop detection"""
-    if drone_id not in drones or not drones[drone_id].connected:
-        return jsonify({'error': 'Drone not connected'}), 404
+    drone, error = _get_connected(drone_id)
+    if error:
+        return error
     
     try:
+        slot = drone.expect_ack(PI_CMD_STOP_DETECTION)
         # Send custom MAVLink command 42001 = Stop Detection
-        drones[drone_id].master.mav.command_long_send(
-            drones[drone_id].master.target_system,
-            drones[drone_id].master.target_component,
-            42001,  # Custom command ID for stop detection
-            0,      # confirmation
-            0, 0, 0, 0, 0, 0, 0  # params
-        )
+        drone.command_long(PI_CMD_STOP_DETECTION)
         
-        logger.info(f"📡 Sent MAVLink command: Stop Detection to Drone {drone_id}")
+        logger.info("📡 Sent MAVLink command: %s to Drone %d", "Stop Detection", drone_id)
         
-        # Wait for ACK
-        ack = drones[drone_id].master.recv_match(type='COMMAND_ACK', blocking=True, timeout=3.0)
-        if ack and ack.command == 42001:
-            success = ack.result == mavutil.mavlink.MAV_RESULT_ACCEPTED
-            return jsonify({
+        # Wait for the ACK (delivered by the telemetry loop)
+        ack_result = drone.wait_ack(PI_CMD_STOP_DETECTION, slot, 3.0)
+        if ack_result is not None:
+            success = ack_result == _MAV_ACCEPTED
+            return ojson({
                 'success': success,
                 'command': 'stop_detection',
                 'drone_id': drone_id,
-                'ack_result': ack.result
+                'ack_result': ack_result
             })
         else:
-            return jsonify({
+            return ojson({
                 'success': False,
                 'command': 'stop_detection',
                 'drone_id': drone_id,
@@ -2421,29 +3267,24 @@ def pi_stop_detection(drone_id):
             })
             
     except Exception as e:
-        logger.error(f"Failed to send stop detection command: {e}")
-        return jsonify({'error': str(e)}), 500
+        logger.error("Failed to send stop detection command: %s", e)
+        return ojson({'error': str(e)}, 500)
 
 
 @app.route('/drone/<int:drone_id>/pi/request_stats', methods=['POST'])
 def pi_request_stats(drone_id):
     """Request detection statistics from Pi via MAVLink"""
-    if drone_id not in drones or not drones[drone_id].connected:
-        return jsonify({'error': 'Drone not connected'}), 404
+    drone, error = _get_connected(drone_id)
+    if error:
+        return error
     
     try:
         # Send custom MAVLink command 42002 = Request Stats
-        drones[drone_id].master.mav.command_long_send(
-            drones[drone_id].master.target_system,
-            drones[drone_id].master.target_component,
-            42002,  # Custom command ID for request stats
-            0,      # confirmation
-            0, 0, 0, 0, 0, 0, 0  # params
-        )
+        drone.command_long(PI_CMD_REQUEST_STATS)
         
-        logger.info(f"📡 Sent MAVLink command: Request Stats to Drone {drone_id}")
+        logger.info("📡 Sent MAVLink command: %s to Drone %d", "Request Stats", drone_id)
         
-        return jsonify({
+        return ojson({
             'success': True,
             'command': 'request_stats',
             'drone_id': drone_id,
@@ -2451,18 +3292,19 @@ def pi_request_stats(drone_id):
         })
             
     except Exception as e:
-        logger.error(f"Failed to send request stats command: {e}")
-        return jsonify({'error': str(e)}), 500
+        logger.error("Failed to send request stats command: %s", e)
+        return ojson({'error': str(e)}, 500)
 
 
 @app.route('/drone/<int:drone_id>/spray/activate', methods=['POST'])
 def activate_spray(drone_id):
     """Activate spray servo/relay"""
-    if drone_id not in drones or not drones[drone_id].connected:
-        return jsonify({'error': 'Drone not connected'}), 404
+    drone, error = _get_connected(drone_id)
+    if error:
+        return error
     
     try:
-        data = request.json or {}
+        data = _json_body() or {}
         duration_sec = data.get('duration_sec', 3)  # Default 3 seconds
         servo_channel = data.get('servo_channel', 9)  # Default servo 9
         pwm_value = data.get('pwm_value', 1900)  # Default PWM for ON
@@ -2470,17 +3312,14 @@ def activate_spray(drone_id):
         logger.info(f"💧 Activating spray for Drone {drone_id}: {duration_sec}s on channel {servo_channel}")
         
         # Send servo command to activate spray
-        drones[drone_id].master.mav.command_long_send(
-            drones[drone_id].master.target_system,
-            drones[drone_id].master.target_component,
+        drone.command_long(
             mavutil.mavlink.MAV_CMD_DO_SET_SERVO,
-            0,  # confirmation
-            servo_channel,  # param1: servo channel
-            pwm_value,      # param2: PWM value
-            0, 0, 0, 0, 0   # unused params
+            (servo_channel,  # param1: servo channel
+             pwm_value,      # param2: PWM value
+             0, 0, 0, 0, 0)  # unused params
         )
         
-        return jsonify({
+        return ojson({
             'success': True,
             'drone_id': drone_id,
             'command': 'spray_activate',
@@ -2490,34 +3329,32 @@ def activate_spray(drone_id):
         
     except Exception as e:
         logger.error(f"Failed to activate spray: {e}")
-        return jsonify({'error': str(e)}), 500
+        return ojson({'error': str(e)}, 500)
 
 
 @app.route('/drone/<int:drone_id>/spray/deactivate', methods=['POST'])
 def deactivate_spray(drone_id):
     """Deactivate spray servo/relay"""
-    if drone_id not in drones or not drones[drone_id].connected:
-        return jsonify({'error': 'Drone not connected'}), 404
+    drone, error = _get_connected(drone_id)
+    if error:
+        return error
     
     try:
-        data = request.json or {}
+        data = _json_body() or {}
         servo_channel = data.get('servo_channel', 9)
         pwm_value = data.get('pwm_value', 1100)  # Default PWM for OFF
         
         logger.info(f"💧 Deactivating spray for Drone {drone_id} on channel {servo_channel}")
         
         # Send servo command to deactivate spray
-        drones[drone_id].master.mav.command_long_send(
-            drones[drone_id].master.target_system,
-            drones[drone_id].master.target_component,
+        drone.command_long(
             mavutil.mavlink.MAV_CMD_DO_SET_SERVO,
-            0,  # confirmation
-            servo_channel,  # param1: servo channel
-            pwm_value,      # param2: PWM value
-            0, 0, 0, 0, 0   # unused params
+            (servo_channel,  # param1: servo channel
+             pwm_value,      # param2: PWM value
+             0, 0, 0, 0, 0)  # unused params
         )
         
-        return jsonify({
+        return ojson({
             'success': True,
             'drone_id': drone_id,
             'command': 'spray_deactivate',
@@ -2526,17 +3363,20 @@ def deactivate_spray(drone_id):
         
     except Exception as e:
         logger.error(f"Failed to deactivate spray: {e}")
-        return jsonify({'error': str(e)}), 500
+        return ojson({'error': str(e)}, 500)
 
 
 @app.route('/drone/<int:drone_id>/spray/spray_at_target', methods=['POST'])
 def spray_at_target(drone_id):
     """Navigate to target and perform spray operation"""
-    if drone_id not in drones or not drones[drone_id].connected:
-        return jsonify({'error': 'Drone not connected'}), 404
+    drone, error = _get_connected(drone_id)
+    if error:
+        return error
     
     try:
-        data = request.json
+        data = _json_body()
+        if data is None:
+            return ojson({'error': 'JSON body required'}, 400)
         latitude = data.get('latitude')
         longitude = data.get('longitude')
         altitude = data.get('altitude', 5)  # Default 5m
@@ -2544,15 +3384,15 @@ def spray_at_target(drone_id):
         spray_duration_sec = data.get('spray_duration_sec', 3)
         
         if not latitude or not longitude:
-            return jsonify({'error': 'Missing latitude or longitude'}), 400
+            return ojson({'error': 'Missing latitude or longitude'}, 400)
         
         logger.info(f"🎯 Spray target for Drone {drone_id}: [{latitude}, {longitude}] @ {altitude}m")
         
         # Navigate to target
-        success = drones[drone_id].goto(latitude, longitude, altitude)
+        success = drone.goto(latitude, longitude, altitude)
         
         if success:
-            return jsonify({
+            return ojson({
                 'success': True,
                 'drone_id': drone_id,
                 'target': {
@@ -2565,25 +3405,28 @@ def spray_at_target(drone_id):
                 'status': 'navigating_to_target'
             })
         else:
-            return jsonify({'success': False, 'error': 'Navigation command failed'}), 500
+            return ojson({'success': False, 'error': 'Navigation command failed'}, 500)
         
     except Exception as e:
         logger.error(f"Failed spray at target operation: {e}")
-        return jsonify({'error': str(e)}), 500
+        return ojson({'error': str(e)}, 500)
 
 
 @app.route('/drone/<int:drone_id>/spray/mission/upload', methods=['POST'])
 def upload_spray_mission(drone_id):
     """Upload a spray mission with multiple targets"""
-    if drone_id not in drones or not drones[drone_id].connected:
-        return jsonify({'error': 'Drone not connected'}), 404
+    drone, error = _get_connected(drone_id)
+    if error:
+        return error
     
     try:
-        data = request.json
+        data = _json_body()
+        if data is None:
+            return ojson({'error': 'JSON body required'}, 400)
         targets = data.get('targets', [])
         
         if not targets:
-            return jsonify({'error': 'No targets provided'}), 400
+            return ojson({'error': 'No targets provided'}, 400)
         
         logger.info(f"📋 Uploading spray mission for Drone {drone_id}: {len(targets)} targets")
         
@@ -2591,8 +3434,8 @@ def upload_spray_mission(drone_id):
         waypoints = []
         
         # Add home/takeoff point as waypoint 0
-        current_lat = drones[drone_id].telemetry.get('latitude', 0)
-        current_lon = drones[drone_id].telemetry.get('longitude', 0)
+        current_lat = drone.telemetry.latitude
+        current_lon = drone.telemetry.longitude
         
         waypoints.append({
             'seq': 0,
@@ -2647,23 +3490,34 @@ def upload_spray_mission(drone_id):
             })
         
         # Upload waypoints to drone
-        upload_result = drones[drone_id].upload_mission(waypoints)
+        upload_result = drone.upload_mission(waypoints)
         
         if upload_result:
-            return jsonify({
+            return ojson({
                 'success': True,
                 'drone_id': drone_id,
                 'waypoints_uploaded': len(waypoints),
                 'spray_targets': len(targets)
             })
         else:
-            return jsonify({'success': False, 'error': 'Mission upload failed'}), 500
+            return ojson({'success': False, 'error': 'Mission upload failed'}, 500)
         
     except Exception as e:
         logger.error(f"Failed to upload spray mission: {e}")
-        return jsonify({'error': str(e)}), 500
+        return ojson({'error': str(e)}, 500)
 
 
 if __name__ == "__main__":
-    # Start the Flask server
-    app.run(host="0.0.0.0", port=5000, debug=True)
+    debug = os.environ.get('GCS_DEBUG') == '1'
+    if serve is not None and not debug:
+        # waitress: production WSGI server with a fixed pool of request threads. It stays
+        # a single process because drone connections live in this process's memory.
+        http_threads = int(os.environ.get('GCS_HTTP_THREADS', 16))
+        logger.info(f"Serving with waitress on port 5000 ({http_threads} threads)")
+        serve(app, host="0.0.0.0", port=5000, threads=http_threads)
+    else:
+        # Flask development server. Each request gets its own thread so one slow drone
+        # command doesn't block the others. The reloader stays off: it runs the app in a
+        # second process, which would open the same serial ports twice and lose drone
+        # state on every restart. For gunicorn + gevent on Linux see README.md.
+        app.run(host="0.0.0.0", port=5000, debug=debug, threaded=True, use_reloader=False)
@@ -65,6 +65,17 @@ app.post('/api/mavlink-detection', (req, res) => {
   res.json({ success: true, message: 'Detection forwarded' });
 });
 
+// Batched form used by the PyMAVLink service: an array of detections per POST
+app.post('/api/mavlink-detection/batch', (req, res) => {
+  const detections = Array.isArray(req.body) ? req.body : [];
+  detections.forEach(detection => {
+    logger.info(`📡 MAVLink detection received: ${detection.detection_id} from Drone ${detection.drone_id}`);
+    io.emit('mavlink_detection', detection);
+  });
+  
+  res.json({ success: true, message: `${detections.length} detection(s) forwarded` });
+});
+
 // Create necessary directories
 [config.PUBLIC_DIR, config.DATA_DIR, config.MISSIONS_DIR, config.KML_UPLOADS_DIR].forEach(dir => {
   if (!fs.existsSync(dir)) {